@@ -1,83 +1,79 @@
 #!/usr/bin/env python3
 
-import os
-from supabase import create_client, Client
+import asyncio
+import json
 
-# Initialize Supabase client
-supabase_url = os.environ.get("SUPABASE_URL")
-supabase_key = os.environ.get("SUPABASE_KEY")
+from supabase_client import SUPABASE_URL, SUPABASE_KEY, supabase_async
 
-if not supabase_url or not supabase_key:
+if not SUPABASE_URL or not SUPABASE_KEY:
     print("❌ Please set SUPABASE_URL and SUPABASE_KEY environment variables")
     exit(1)
 
-supabase: Client = create_client(supabase_url, supabase_key)
+
+async def build_rooms_report() -> dict:
+    """Fetch room types and rooms concurrently and return a JSON-ready
+    diagnostic report (counts, type-name mismatches, availability per type).
+
+    Reusable from routes as well as the CLI below - it returns data
+    instead of printing it.
+    """
+    room_types_result, rooms_result = await asyncio.gather(
+        supabase_async.table("room_types").select("id, name, is_available").execute(),
+        supabase_async.table("rooms").select("room_number, room_type, status").execute(),
+    )
+    room_types = room_types_result.data or []
+    rooms = rooms_result.data or []
+
+    # Check matching - set lookups instead of scanning per name
+    room_type_names = [rt["name"] for rt in room_types]
+    room_types_in_rooms = set(r["room_type"] for r in rooms)
+    room_types_in_rooms_lower = set(rt.lower() for rt in room_types_in_rooms)
+
+    mismatches = []
+    for room_type_name in room_type_names:
+        if room_type_name not in room_types_in_rooms:
+            if room_type_name.lower() in room_types_in_rooms_lower:
+                mismatches.append(f"Case mismatch: '{room_type_name}' vs rooms table")
+            else:
+                mismatches.append(f"No match found for: '{room_type_name}'")
+
+    # Available rooms per active type, from the already-fetched rows
+    available_by_type = {}
+    for rt in room_types:
+        if rt["is_available"]:
+            available_by_type[rt["name"]] = [
+                r["room_number"] for r in rooms
+                if r["room_type"] == rt["name"] and r["status"] == "Available"
+            ]
+
+    return {
+        "room_types": room_types,
+        "rooms": rooms,
+        "room_type_names": room_type_names,
+        "room_types_in_rooms": sorted(room_types_in_rooms),
+        "mismatches": mismatches,
+        "available_rooms_by_type": available_by_type,
+    }
+
 
 def debug_rooms_and_types():
     print("🔍 Debugging Room Types and Rooms...")
     print("=" * 50)
-    
-    # Get room types
+
     try:
-        room_types_result = supabase.table("room_types").select("*").execute()
-        room_types = room_types_result.data
-        
-        print(f"📋 Found {len(room_types)} room types:")
-        for rt in room_types:
-            print(f"   - ID: {rt['id']}, Name: '{rt['name']}', Available: {rt['is_available']}")
-        
-        print("\n" + "=" * 50)
-        
-        # Get rooms
-        rooms_result = supabase.table("rooms").select("*").execute()
-        rooms = rooms_result.data
-        
-        print(f"🏨 Found {len(rooms)} rooms:")
-        for room in rooms:
-            print(f"   - Number: {room['room_number']}, Type: '{room['room_type']}', Status: {room['status']}")
-        
-        print("\n" + "=" * 50)
-        
-        # Check matching
-        room_type_names = [rt["name"] for rt in room_types]
-        room_types_in_rooms = list(set([r["room_type"] for r in rooms]))
-        
-        print("🔗 Room Type Matching Analysis:")
-        print(f"Room type names: {room_type_names}")
-        print(f"Room types in rooms table: {room_types_in_rooms}")
-        
-        # Check for mismatches
-        mismatches = []
-        for room_type_name in room_type_names:
-            exact_match = any(rt == room_type_name for rt in room_types_in_rooms)
-            case_insensitive_match = any(rt.lower() == room_type_name.lower() for rt in room_types_in_rooms)
-            
-            if not exact_match:
-                if case_insensitive_match:
-                    mismatches.append(f"Case mismatch: '{room_type_name}' vs rooms table")
-                else:
-                    mismatches.append(f"No match found for: '{room_type_name}'")
-        
-        if mismatches:
+        report = asyncio.run(build_rooms_report())
+        print(json.dumps(report, indent=2))
+
+        if report["mismatches"]:
             print("\n⚠️  ISSUES FOUND:")
-            for mismatch in mismatches:
+            for mismatch in report["mismatches"]:
                 print(f"   - {mismatch}")
         else:
             print("\n✅ All room types match!")
-            
-        # Check available rooms for each type
-        print("\n" + "=" * 50)
-        print("🏨 Available Rooms by Type:")
-        
-        for rt in room_types:
-            if rt['is_available']:
-                available_rooms = [r for r in rooms if r['room_type'].lower() == rt['name'].lower() and r['status'] == 'Available']
-                print(f"   - {rt['name']}: {len(available_rooms)} available rooms")
-                for room in available_rooms:
-                    print(f"     * {room['room_number']}")
-        
+
     except Exception as e:
         print(f"❌ Error: {e}")
 
+
 if __name__ == "__main__":
     debug_rooms_and_types()
@@ -1,17 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from routes import bookings, rooms, dashboard, room_type, login, billing, notifications, availability_routes
+import anyio.to_thread
 import logging
+import orjson
+import os
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
-    title="Hotel Management API", 
+    title="Hotel Management API",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -33,38 +38,53 @@ app.include_router(login.router, tags=["login"])
 app.include_router(billing.router, tags=["billing"])
 app.include_router(notifications.router, prefix="/api/notifications", tags=['notifications'])
 
+# Static payloads - serialized once at import instead of per request
+ROOT_PAYLOAD = orjson.dumps({
+    "message": "Hotel Management API v2.0",
+    "status": "running",
+    "endpoints": {
+        "availability": "/availability/*",
+        "bookings": "/bookings/*",
+        "rooms": "/rooms/*",
+        "dashboard": "/dashboard/*",
+        "room_types": "/room-types/*",
+        "auth": "/auth/*",
+        "billing": "/billing/*",
+        "notifications": "/api/notifications/*",
+        "docs": "/docs",
+        "redoc": "/redoc"
+    }
+})
+
+HEALTH_PAYLOAD = orjson.dumps({"status": "healthy", "version": "2.0.0"})
+
 @app.get("/")
 def read_root():
-    return {
-        "message": "Hotel Management API v2.0",
-        "status": "running",
-        "endpoints": {
-            "availability": "/availability/*",
-            "bookings": "/bookings/*",
-            "rooms": "/rooms/*",
-            "dashboard": "/dashboard/*",
-            "room_types": "/room-types/*",
-            "auth": "/auth/*",
-            "billing": "/billing/*",
-            "notifications": "/api/notifications/*",
-            "docs": "/docs",
-            "redoc": "/redoc"
-        }
-    }
+    return Response(content=ROOT_PAYLOAD, media_type="application/json")
 
 @app.get("/health")
 def health_check():
     """Health check endpoint for monitoring"""
-    return {"status": "healthy", "version": "2.0.0"}
+    return Response(content=HEALTH_PAYLOAD, media_type="application/json")
 
 # Log all routes on startup
 @app.on_event("startup")
 async def startup_event():
     logger.info("🚀 Application starting up...")
-    logger.info("📋 Available routes:")
-    for route in app.routes:
-        if hasattr(route, "methods"):
-            logger.info(f"  {list(route.methods)[0]:6} {route.path}")
+    # Sync Supabase calls still funnel through anyio's default thread
+    # pool (40 threads); under ~50 concurrent requests they queue for
+    # seconds. Size it deliberately - Supavisor exhaustion is prevented
+    # separately by supabase_client.run_db's semaphore.
+    thread_pool_size = int(os.environ.get("DB_THREADPOOL_SIZE", "100"))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = thread_pool_size
+    logger.info(f"🧵 Thread pool sized to {thread_pool_size}")
+    # Formatting the whole route table on every boot is wasted work in
+    # production containers - opt in with LOG_ROUTES=1 when debugging.
+    if os.environ.get("LOG_ROUTES"):
+        logger.info("📋 Available routes:")
+        for route in app.routes:
+            if hasattr(route, "methods"):
+                logger.info(f"  {list(route.methods)[0]:6} {route.path}")
     logger.info("✅ Application startup complete")
 
 @app.on_event("shutdown")
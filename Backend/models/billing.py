@@ -1,91 +1,52 @@
 # models/billing.py - Updated for separated billing flow
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Literal
 
 class Billing(BaseModel):
+    # Numeric bounds live in Field constraints (checked in pydantic-core)
+    # instead of Python-level @field_validator methods
     booking_id: str
-    room_price: float
-    discount: Optional[float] = 0.0
-    vat: float = 13.0  # Default VAT rate
-    total_amount: float
+    room_price: float = Field(gt=0)
+    discount: Optional[float] = Field(0.0, ge=0, le=100)
+    vat: float = Field(13.0, ge=0, le=30)  # Default VAT rate
+    total_amount: float = Field(gt=0)
     payment_method: Literal["Cash", "Card", "Online", "Admin"] = "Online"
     payment_status: Literal["Paid", "Pending", "Failed", "Refunded"] = "Paid"
     is_cancelled: Optional[bool] = False
     cancelled_at: Optional[str] = None
 
-    @field_validator("discount")
-    @classmethod
-    def validate_discount(cls, v):
-        if v < 0 or v > 100:
-            raise ValueError("Discount must be between 0 and 100")
-        return v
-
-    @field_validator("vat")
-    @classmethod
-    def validate_vat(cls, v):
-        if v < 0 or v > 30:
-            raise ValueError("VAT must be between 0 and 30")
-        return v
-
-    @field_validator("total_amount")
-    @classmethod
-    def validate_total_amount(cls, v):
-        if v <= 0:
-            raise ValueError("Total amount must be greater than 0")
-        return v
-
-    @field_validator("room_price")
-    @classmethod
-    def validate_room_price(cls, v):
-        if v <= 0:
-            raise ValueError("Room price must be greater than 0")
-        return v
-
 # Billing creation request (for customers)
 class BillingCreateRequest(BaseModel):
     booking_id: str
     payment_method: Literal["Cash", "Card", "Online"] = "Online"
     payment_status: Literal["Paid", "Pending"] = "Paid"
 
+# Calculation input - typed so pydantic-core validates once at parse
+# time instead of .get() + float()/int() coercion inside the handler
+class CalculateBillingRequest(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    room_price: float = Field(gt=0)
+    nights: int = Field(gt=0)
+
 # Update model for billing
 class BillingUpdate(BaseModel):
-    room_price: Optional[float] = None
-    discount: Optional[float] = None
-    vat: Optional[float] = None
-    total_amount: Optional[float] = None
+    # Constraints declared on the fields run in pydantic-core and are
+    # skipped entirely for None, unlike the old None-aware @field_validators
+    model_config = ConfigDict(extra="ignore")
+
+    room_price: Optional[float] = Field(None, gt=0)
+    discount: Optional[float] = Field(None, ge=0, le=100)
+    vat: Optional[float] = Field(None, ge=0, le=30)
+    total_amount: Optional[float] = Field(None, gt=0)
     payment_method: Optional[Literal["Cash", "Card", "Online", "Admin"]] = None
     payment_status: Optional[Literal["Paid", "Pending", "Failed", "Refunded"]] = None
 
-    @field_validator("discount")
-    @classmethod
-    def validate_discount(cls, v):
-        if v is not None and (v < 0 or v > 100):
-            raise ValueError("Discount must be between 0 and 100")
-        return v
-
-    @field_validator("vat")
-    @classmethod
-    def validate_vat(cls, v):
-        if v is not None and (v < 0 or v > 30):
-            raise ValueError("VAT must be between 0 and 30")
-        return v
-
-    @field_validator("total_amount")
-    @classmethod
-    def validate_total_amount(cls, v):
-        if v is not None and v <= 0:
-            raise ValueError("Total amount must be greater than 0")
-        return v
-
-    @field_validator("room_price")
-    @classmethod
-    def validate_room_price(cls, v):
-        if v is not None and v <= 0:
-            raise ValueError("Room price must be greater than 0")
-        return v
-
 # Response model for billing operations
+# Frozen: pure data carriers, never mutated after construction
 class BillingResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     success: bool
     booking_id: str
     billing_id: Optional[int] = None
@@ -95,6 +56,8 @@ class BillingResponse(BaseModel):
 
 # Billing details with breakdown
 class BillingDetails(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     booking_id: str
     room_price: float
     nights: int
@@ -111,6 +74,8 @@ class BillingDetails(BaseModel):
 
 # Billing summary for admin dashboard
 class BillingSummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     booking_id: str
     guest_name: str
     room_number: str
@@ -1,16 +1,15 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
-from decimal import Decimal
 
 class BillingSettings(BaseModel):
     id: Optional[int] = None
-    vat: Decimal
-    discount: Decimal
+    vat: float = Field(ge=0, le=30)
+    discount: float = Field(ge=0, le=100)
     updated_at: Optional[str] = None
 
 class BillingSettingsUpdate(BaseModel):
-    vat: Decimal
-    discount: Decimal
+    vat: float = Field(ge=0, le=30)
+    discount: float = Field(ge=0, le=100)
 
 class BillingSettingsResponse(BaseModel):
     success: bool
@@ -1,6 +1,6 @@
 # models/booking.py - Updated with check-in/out time fields
-from pydantic import BaseModel, EmailStr, model_validator, Field
-from datetime import date, time
+from pydantic import BaseModel, ConfigDict, EmailStr, model_validator, Field
+from datetime import date, datetime, time
 from typing import Optional, Literal
 
 class Booking(BaseModel):
@@ -27,6 +27,8 @@ class Booking(BaseModel):
         return self
 
 class BookingUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     email: Optional[EmailStr] = None
@@ -57,39 +59,41 @@ class FrontendBookingRequest(BaseModel):
     guests: Optional[int] = 2
 
     @model_validator(mode="after")
-    def validate_dates(self) -> 'FrontendBookingRequest':
-        from datetime import datetime
+    def validate_request(self) -> 'FrontendBookingRequest':
+        """Single post-validation pass: dates, check-in time, name, amount."""
         try:
-            check_in_date = datetime.fromisoformat(self.check_in).date()
-            check_out_date = datetime.fromisoformat(self.check_out).date()
+            check_in_date = date.fromisoformat(self.check_in)
+            check_out_date = date.fromisoformat(self.check_out)
             if check_out_date <= check_in_date:
                 raise ValueError("Check-out must be after check-in.")
         except ValueError as e:
             if "Check-out must be after check-in" in str(e):
                 raise e
             raise ValueError("Invalid date format. Use YYYY-MM-DD format.")
-        return self
 
-    @model_validator(mode="after")
-    def validate_check_in_time(self) -> 'FrontendBookingRequest':
+        # Cache parsed dates (and derived stay length) so route handlers
+        # don't re-parse them
+        object.__setattr__(self, "check_in_date", check_in_date)
+        object.__setattr__(self, "check_out_date", check_out_date)
+        object.__setattr__(self, "nights", (check_out_date - check_in_date).days or 1)
+
         if self.check_in_time:
-            from datetime import datetime
             try:
                 datetime.strptime(self.check_in_time, "%H:%M")
             except ValueError:
                 raise ValueError("Invalid check-in time format. Use HH:MM format (e.g., 14:00)")
-        return self
 
-    @model_validator(mode="after")
-    def validate_guest_name(self) -> 'FrontendBookingRequest':
         if not self.guest_name or len(self.guest_name.strip()) < 2:
             raise ValueError("Guest name must be at least 2 characters long.")
-        return self
 
-    @model_validator(mode="after")
-    def validate_total_amount(self) -> 'FrontendBookingRequest':
         if self.total_amount <= 0:
             raise ValueError("Total amount must be greater than 0.")
+
+        # Cache derived guest fields so handlers don't redo the string work
+        name_parts = self.guest_name.split(" ", 1)
+        object.__setattr__(self, "first_name", name_parts[0])
+        object.__setattr__(self, "last_name", name_parts[1] if len(name_parts) > 1 else "")
+        object.__setattr__(self, "phone_int", int(self.guest_phone) if self.guest_phone and self.guest_phone.isdigit() else 0)
         return self
 
 # Admin booking request model
@@ -112,31 +116,42 @@ class AdminBookingRequest(BaseModel):
     payment_status: Optional[Literal["Paid", "Pending"]] = "Pending"
 
     @model_validator(mode="after")
-    def validate_dates(self) -> 'AdminBookingRequest':
-        from datetime import datetime
+    def validate_request(self) -> 'AdminBookingRequest':
+        """Single post-validation pass: dates and check-in time."""
         try:
-            check_in_date = datetime.fromisoformat(self.check_in).date()
-            check_out_date = datetime.fromisoformat(self.check_out).date()
+            check_in_date = date.fromisoformat(self.check_in)
+            check_out_date = date.fromisoformat(self.check_out)
             if check_out_date <= check_in_date:
                 raise ValueError("Check-out must be after check-in.")
         except ValueError as e:
             if "Check-out must be after check-in" in str(e):
                 raise e
             raise ValueError("Invalid date format. Use YYYY-MM-DD format.")
-        return self
 
-    @model_validator(mode="after")
-    def validate_check_in_time(self) -> 'AdminBookingRequest':
+        # Cache parsed dates (and derived stay length) so route handlers
+        # don't re-parse them
+        object.__setattr__(self, "check_in_date", check_in_date)
+        object.__setattr__(self, "check_out_date", check_out_date)
+        object.__setattr__(self, "nights", (check_out_date - check_in_date).days or 1)
+
         if self.check_in_time:
-            from datetime import datetime
             try:
                 datetime.strptime(self.check_in_time, "%H:%M")
             except ValueError:
                 raise ValueError("Invalid check-in time format. Use HH:MM format (e.g., 14:00)")
+
+        # Cache derived guest fields so handlers don't redo the string work
+        name_parts = self.guest_name.split(" ", 1)
+        object.__setattr__(self, "first_name", name_parts[0])
+        object.__setattr__(self, "last_name", name_parts[1] if len(name_parts) > 1 else "")
+        object.__setattr__(self, "phone_int", int(self.guest_phone) if self.guest_phone and self.guest_phone.isdigit() else 0)
         return self
 
 # Response models
+# Frozen: pure data carriers, never mutated after construction
 class BookingResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     success: bool
     booking_id: str
     room_number: str
@@ -145,6 +160,8 @@ class BookingResponse(BaseModel):
     status: Optional[str] = None
 
 class BookingWithUser(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     booking_id: str
     check_in: date
     check_out: date
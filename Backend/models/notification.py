@@ -2,6 +2,7 @@ from typing import Optional, List
 from pydantic import BaseModel
 from fastapi import WebSocket
 import asyncio
+import orjson
 
 # 🧩 Pydantic Models
 class NotificationCreate(BaseModel):
@@ -33,17 +34,28 @@ class ConnectionManager:
         print(f"Client disconnected. Total connections: {len(self.active_connections)}")
 
     async def broadcast(self, message: dict):
-        """Broadcast notification to all connected clients"""
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                print(f"Error sending to client: {e}")
-                disconnected.append(connection)
-        
-        for conn in disconnected:
-            self.disconnect(conn)
+        """Broadcast notification to all connected clients in parallel.
+
+        Sends run concurrently with a per-socket timeout so one slow
+        client can't delay the rest of the fan-out. The payload is
+        serialized once instead of once per connection.
+        """
+        if not self.active_connections:
+            return
+
+        payload = orjson.dumps(message).decode()
+
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(connection.send_text(payload), timeout=1.0)
+              for connection in connections),
+            return_exceptions=True
+        )
+
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                print(f"Error sending to client: {result}")
+                self.disconnect(connection)
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         try:
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Literal, Optional
 
 class Room(BaseModel):
@@ -20,6 +20,8 @@ class RoomUpdate(BaseModel):
     status: Literal["Available", "Occupied", "Maintenance"]
 
 class RoomResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     room_number: str
     room_type: str
     status: str
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from datetime import datetime
 
@@ -30,6 +30,8 @@ class RoomType(RoomTypeBase):
         from_attributes = True
 
 class RoomTypeResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     id: int
     name: str
     base_price: float
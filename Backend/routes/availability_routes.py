@@ -1,14 +1,20 @@
 # routes/availability_routes.py - Complete with all endpoints
 from fastapi import APIRouter, HTTPException, Query
-from supabase_client import supabase
+from supabase_client import supabase_async, retry_db
 from datetime import datetime, date, timedelta, timezone
 from typing import List
+from collections import Counter, defaultdict
+from functools import lru_cache
 import logging
 import asyncio
-from utils.cache_helper import CacheManager
+import time
+from utils.cache_helper import CacheManager, get_room_types_cached
 
 router = APIRouter()
-logging.basicConfig(level=logging.INFO)
+# Logging is configured once in main.py; modules just grab a named logger
+logger = logging.getLogger(__name__)
+
+UTC = timezone.utc
 
 # ============================================
 # TIMEZONE UTILITIES
@@ -17,117 +23,163 @@ logging.basicConfig(level=logging.INFO)
 def utc_to_pkt(utc_dt: datetime) -> datetime:
     """Convert UTC datetime to PKT (UTC+5)"""
     if utc_dt.tzinfo is None:
-        utc_dt = utc_dt.replace(tzinfo=timezone.utc)
+        utc_dt = utc_dt.replace(tzinfo=UTC)
     else:
-        utc_dt = utc_dt.astimezone(timezone.utc)
+        utc_dt = utc_dt.astimezone(UTC)
     return utc_dt + timedelta(hours=5)
 
+# (monotonic timestamp, PKT day) - refreshed every 30s; the day only
+# actually changes once every 24h but bulk endpoints call this per row.
+# Seeded with -inf, never 0.0: time.monotonic() counts from host boot,
+# so a 0.0 sentinel would look "fresh" for the first 30s after a reboot
+# and hand out the placeholder day instead of computing a real one.
+_pkt_today_cache = (float("-inf"), date.min)
+
+
 def get_pkt_today() -> date:
-    """Get current date in PKT timezone"""
-    return utc_to_pkt(datetime.utcnow()).date()
+    """Get current date in PKT timezone (memoized for 30s)"""
+    global _pkt_today_cache
+    ts = time.monotonic()
+    cached_ts, cached_day = _pkt_today_cache
+    if ts - cached_ts < 30:
+        return cached_day
+    today = utc_to_pkt(datetime.now(UTC)).date()
+    _pkt_today_cache = (ts, today)
+    return today
 
 # ============================================
-# HELPER: ROOM AVAILABILITY CHECK
+# HELPER: DATE PARSING
 # ============================================
 
-async def check_room_availability(room_number: str, check_in: date, check_out: date) -> bool:
-    """Check if a room is available for the given date range (PKT-aware)."""
-    try:
-        room_result = await asyncio.to_thread(
-            lambda: supabase.table("rooms")
-            .select("status")
-            .eq("room_number", room_number)
-            .execute()
-        )
-        
-        if not room_result.data:
-            return False
-        
-        room_status = room_result.data[0]["status"]
-        
-        if room_status == "Maintenance":
-            return False
-        
-        pkt_today = get_pkt_today()
-        
-        bookings_result = await asyncio.to_thread(
-            lambda: supabase.table("bookings")
-            .select("check_in, check_out, status")
-            .eq("room_number", room_number)
-            .eq("is_cancelled", False)
-            .execute()
-        )
-        
-        for booking in bookings_result.data:
-            booking_check_in = date.fromisoformat(booking["check_in"]) if isinstance(booking["check_in"], str) else booking["check_in"]
-            booking_check_out = date.fromisoformat(booking["check_out"]) if isinstance(booking["check_out"], str) else booking["check_out"]
-            
-            if check_in < booking_check_out and check_out > booking_check_in:
-                logging.info(f"❌ Room {room_number} has overlapping booking: {booking_check_in} to {booking_check_out}")
-                return False
-            
-            if pkt_today >= booking_check_in and pkt_today < booking_check_out:
-                logging.info(f"❌ Room {room_number} is currently occupied")
-                return False
-        
-        return True
-        
-    except Exception as e:
-        logging.error(f"Error checking availability for {room_number}: {e}")
-        return False
+@lru_cache(maxsize=4096)
+def _parse_iso_date(value: str) -> date:
+    """Cached date.fromisoformat - booking rows repeat the same few ISO
+    strings heavily, so most parses become a dict hit."""
+    return date.fromisoformat(value)
+
+
+def _to_date(value) -> date:
+    """Coerce a check_in/check_out column value to a date."""
+    return _parse_iso_date(value) if isinstance(value, str) else value
 
 # ============================================
 # HELPER: GET AVAILABLE ROOMS (OPTIMIZED)
 # ============================================
 
-async def get_available_rooms_optimized(room_type_id: int, check_in: date, check_out: date) -> List[dict]:
-    """Get available rooms for a room type (optimized with single queries)."""
+async def get_available_rooms_optimized(room_type_id: int, check_in: date, check_out: date,
+                                        room_type_name: str = None) -> List[dict]:
+    """Get available rooms for a room type.
+
+    Prefers the available_rooms RPC (sql/availability_rpc.sql), which does
+    the overlap test against a GiST range index in Postgres and returns only
+    the free rooms. Falls back to the Python overlap scan when the function
+    is not installed.
+
+    Callers that already hold the room type row should pass room_type_name
+    so the fallback skips its name lookup.
+    """
     try:
-        room_type_result = await asyncio.to_thread(
-            lambda: supabase.table("room_types")
-            .select("name")
-            .eq("id", room_type_id)
-            .execute()
-        )
-        
-        if not room_type_result.data:
-            return []
-        
-        room_type_name = room_type_result.data[0]["name"]
-        
-        rooms_result = await asyncio.to_thread(
-            lambda: supabase.table("rooms")
-            .select("room_number, room_type, room_type_id, status")
-            .eq("room_type_id", room_type_id)
-            .neq("status", "Maintenance")
-            .execute()
+        result = await retry_db(
+            lambda: supabase_async.rpc("available_rooms", {
+                "p_room_type_id": room_type_id,
+                "p_check_in": check_in.isoformat(),
+                "p_check_out": check_out.isoformat()
+            }).execute()
         )
-        
-        if not rooms_result.data:
+        return result.data or []
+    except Exception as e:
+        logger.warning("available_rooms RPC unavailable, using Python fallback: %s", e)
+        return await _get_available_rooms_fallback(room_type_id, check_in, check_out, room_type_name)
+
+
+# Cap fan-out when checking many room types at once so a long type list
+# doesn't open one Postgres connection per type
+_AVAILABILITY_SEMAPHORE = asyncio.Semaphore(10)
+
+
+async def _available_rooms_limited(room_type_id: int, check_in: date, check_out: date,
+                                   room_type_name: str = None) -> List[dict]:
+    """get_available_rooms_optimized behind the shared concurrency cap."""
+    async with _AVAILABILITY_SEMAPHORE:
+        return await get_available_rooms_optimized(room_type_id, check_in, check_out, room_type_name)
+
+
+async def _room_status_counts() -> defaultdict:
+    """Per-room-type status counts, aggregated in Postgres when the
+    room_status_counts RPC (sql/availability_rpc.sql) is installed;
+    otherwise one bulk fetch counted in Python."""
+    status_by_type = defaultdict(Counter)
+    try:
+        result = await supabase_async.rpc("room_status_counts", {}).execute()
+        for row in result.data or []:
+            status_by_type[row["room_type_id"]][row["status"]] = row["c"]
+        return status_by_type
+    except Exception as e:
+        logger.warning("room_status_counts RPC unavailable, counting in Python: %s", e)
+
+    rooms_result = await (
+        supabase_async.table("rooms")
+        .select("room_type_id, status")
+        .execute()
+    )
+    for room in rooms_result.data or []:
+        status_by_type[room["room_type_id"]][room["status"]] += 1
+    return status_by_type
+
+
+async def _get_available_rooms_fallback(room_type_id: int, check_in: date, check_out: date,
+                                        room_type_name: str = None) -> List[dict]:
+    """Python-side overlap scan used when the available_rooms RPC is missing."""
+    try:
+        if room_type_name is None:
+            room_type_result = await (
+                supabase_async.table("room_types")
+                .select("name")
+                .eq("id", room_type_id)
+                .execute()
+            )
+
+            if not room_type_result.data:
+                return []
+
+            room_type_name = room_type_result.data[0]["name"]
+
+        pkt_today = get_pkt_today()
+
+        # Room lists change rarely (new rooms, maintenance), so they come
+        # from the short-TTL in-process cache; booking writes invalidate
+        # it. Availability itself still goes to the DB below.
+        room_rows = await CacheManager.get_rooms_of_type_cached(room_type_id)
+        # When the requested window includes today, rooms.status already
+        # tells us which rooms are occupied - filter them out instead of
+        # re-deriving occupancy from bookings
+        if check_in <= pkt_today < check_out:
+            room_rows = [r for r in room_rows if r["status"] != "Occupied"]
+
+        if not room_rows:
             return []
-        
-        room_numbers = [r["room_number"] for r in rooms_result.data]
-        bookings_result = await asyncio.to_thread(
-            lambda: supabase.table("bookings")
+
+        room_numbers = [r["room_number"] for r in room_rows]
+        check_in_iso = check_in.isoformat()
+        check_out_iso = check_out.isoformat()
+        bookings_result = await (
+            supabase_async.table("bookings")
             .select("room_number, check_in, check_out, status")
             .in_("room_number", room_numbers)
             .eq("is_cancelled", False)
-            .gte("check_out", check_in.isoformat())
-            .lte("check_in", check_out.isoformat())
+            .gte("check_out", check_in_iso)
+            .lte("check_in", check_out_iso)
             .execute()
         )
         
         occupied_rooms = set()
-        pkt_today = get_pkt_today()
-        
+
         for booking in bookings_result.data:
-            booking_check_in = date.fromisoformat(booking["check_in"]) if isinstance(booking["check_in"], str) else booking["check_in"]
-            booking_check_out = date.fromisoformat(booking["check_out"]) if isinstance(booking["check_out"], str) else booking["check_out"]
-            
+            booking_check_in = _to_date(booking["check_in"])
+            booking_check_out = _to_date(booking["check_out"])
+
             if check_in < booking_check_out and check_out > booking_check_in:
                 occupied_rooms.add(booking["room_number"])
-            elif pkt_today >= booking_check_in and pkt_today < booking_check_out:
-                occupied_rooms.add(booking["room_number"])
         
         available_rooms = [
             {
@@ -136,16 +188,41 @@ async def get_available_rooms_optimized(room_type_id: int, check_in: date, check
                 "room_type_id": room["room_type_id"],
                 "status": room["status"]
             }
-            for room in rooms_result.data
+            for room in room_rows
             if room["room_number"] not in occupied_rooms
         ]
         
         return available_rooms
         
     except Exception as e:
-        logging.error(f"Error getting available rooms: {e}")
+        logger.error("Error getting available rooms: %s", e)
         return []
 
+# ============================================
+# HELPER: RESPONSE PAYLOAD BUILDER
+# ============================================
+
+def _base_room_type_payload(room_type: dict) -> dict:
+    """Common response fields for the room-type listing endpoints.
+
+    Binds .get once so each field costs a single lookup instead of a
+    method resolution + hash per key inside the per-type loops.
+    """
+    get = room_type.get
+    max_adults = get("max_adults", 2)
+    max_children = get("max_children", 1)
+    return {
+        "id": room_type["id"],
+        "name": room_type["name"],
+        "base_price": room_type["base_price"],
+        "max_adults": max_adults,
+        "max_children": max_children,
+        "total_capacity": max_adults + max_children,
+        "amenities": get("amenities", []),
+        "description": get("description", ""),
+        "image_url": get("image_url", "")
+    }
+
 # ============================================
 # ENDPOINT: AVAILABLE ROOM TYPES (CUSTOMER)
 # ============================================
@@ -156,55 +233,46 @@ async def get_available_room_types_for_booking():
     Get all available room types (customer view).
     Shows room types that are marked as available in the system.
     """
-    cache_key = "available_room_types_for_booking"
+    # Scoped by PKT day: availability depends on "today" downstream
+    cache_key = CacheManager.ROOM_TYPES_FOR_BOOKING_KEY.format(
+        pkt_day=get_pkt_today().isoformat()
+    )
     cached_data = CacheManager.get_cache(cache_key)
     if cached_data:
         return cached_data
     
     try:
-        result = await asyncio.to_thread(
-            lambda: supabase.table("room_types")
-            .select("*")
-            .eq("is_available", True)
+        all_room_types = await get_room_types_cached()
+
+        # One bulk fetch + in-process grouping instead of one COUNT query
+        # per room type (N+1)
+        rooms_result = await (
+            supabase_async.table("rooms")
+            .select("room_type_id")
+            .neq("status", "Maintenance")
             .execute()
         )
-        
+        rooms_per_type = Counter(r["room_type_id"] for r in rooms_result.data or [])
+
         room_types = []
-        for room_type in result.data:
-            max_adults = room_type.get("max_adults", 2)
-            max_children = room_type.get("max_children", 1)
-            
-            rooms_count_result = await asyncio.to_thread(
-                lambda: supabase.table("rooms")
-                .select("room_number", count="exact")
-                .eq("room_type_id", room_type["id"])
-                .neq("status", "Maintenance")
-                .execute()
-            )
-            
-            total_rooms = rooms_count_result.count or 0
-            
-            room_types.append({
-                "id": room_type["id"],
-                "name": room_type["name"],
-                "base_price": room_type["base_price"],
-                "max_adults": max_adults,
-                "max_children": max_children,
-                "total_capacity": max_adults + max_children,
-                "amenities": room_type.get("amenities", []),
-                "total_rooms_count": total_rooms,
-                "description": room_type.get("description", ""),
-                "image_url": room_type.get("image_url", ""),
+        for room_type in all_room_types:
+            if not room_type.get("is_available"):
+                continue
+
+            payload = _base_room_type_payload(room_type)
+            payload.update({
+                "total_rooms_count": rooms_per_type.get(room_type["id"], 0),
                 "is_available": True,
                 "created_at": room_type.get("created_at", ""),
                 "updated_at": room_type.get("updated_at")
             })
+            room_types.append(payload)
         
-        CacheManager.set_cache(cache_key, room_types, 900)
+        CacheManager.set_cache(cache_key, room_types, CacheManager.ROOM_TYPES_TTL)
         return room_types
         
     except Exception as e:
-        logging.error(f"Error getting available room types: {e}")
+        logger.error("Error getting available room types: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============================================
@@ -217,46 +285,37 @@ async def get_available_room_types_for_admin(
     check_out: date = Query(...)
 ):
     """Get room types with available rooms for admin (shows all room types)."""
-    cache_key = f"admin_room_types:{check_in.isoformat()}:{check_out.isoformat()}"
+    cache_key = CacheManager.ADMIN_ROOM_TYPES_KEY.format(
+        check_in=check_in.isoformat(), check_out=check_out.isoformat()
+    )
     cached_data = CacheManager.get_cache(cache_key)
     if cached_data:
         return cached_data
     
     try:
-        result = await asyncio.to_thread(
-            lambda: supabase.table("room_types")
-            .select("*")
-            .execute()
-        )
-        
+        all_room_types = await get_room_types_cached()
+
+        # Fan the independent per-type checks out concurrently: wall-clock
+        # cost becomes max(RTT) instead of sum(RTT)
+        availability_lists = await asyncio.gather(*(
+            _available_rooms_limited(rt["id"], check_in, check_out, rt["name"])
+            for rt in all_room_types
+        ))
+
         room_types = []
-        for room_type in result.data:
-            available_rooms = await get_available_rooms_optimized(
-                room_type["id"], check_in, check_out
-            )
-            
-            max_adults = room_type.get("max_adults", 2)
-            max_children = room_type.get("max_children", 1)
-            
-            room_types.append({
-                "id": room_type["id"],
-                "name": room_type["name"],
-                "base_price": room_type["base_price"],
-                "max_adults": max_adults,
-                "max_children": max_children,
-                "total_capacity": max_adults + max_children,
-                "amenities": room_type.get("amenities", []),
+        for room_type, available_rooms in zip(all_room_types, availability_lists):
+            payload = _base_room_type_payload(room_type)
+            payload.update({
                 "available_rooms_count": len(available_rooms),
-                "description": room_type.get("description", ""),
-                "image_url": room_type.get("image_url", ""),
                 "is_available": len(available_rooms) > 0
             })
+            room_types.append(payload)
         
         CacheManager.set_cache(cache_key, room_types, CacheManager.AVAILABILITY_TTL)
         return room_types
         
     except Exception as e:
-        logging.error(f"Error getting room types for admin: {e}")
+        logger.error("Error getting room types for admin: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============================================
@@ -280,10 +339,10 @@ async def get_available_rooms(
         return cached_data
     
     try:
-        logging.info(f"🔍 Checking available rooms for '{room_type}' from {check_in} to {check_out}")
+        logger.info("🔍 Checking available rooms for '%s' from %s to %s", room_type, check_in, check_out)
         
-        room_type_result = await asyncio.to_thread(
-            lambda: supabase.table("room_types")
+        room_type_result = await (
+            supabase_async.table("room_types")
             .select("id, base_price, amenities, max_adults, max_children")
             .ilike("name", room_type)
             .single()
@@ -291,7 +350,7 @@ async def get_available_rooms(
         )
         
         if not room_type_result.data:
-            logging.warning(f"Room type not found: {room_type}")
+            logger.warning("Room type not found: %s", room_type)
             return {"available_rooms": []}
         
         rt_info = room_type_result.data
@@ -299,7 +358,8 @@ async def get_available_rooms(
         available_rooms = await get_available_rooms_optimized(
             room_type_id=rt_info["id"],
             check_in=check_in,
-            check_out=check_out
+            check_out=check_out,
+            room_type_name=room_type
         )
         
         detailed_rooms = [{
@@ -313,11 +373,11 @@ async def get_available_rooms(
         result = {"available_rooms": detailed_rooms}
         CacheManager.set_cache(cache_key, result, CacheManager.AVAILABILITY_TTL)
         
-        logging.info(f"Found {len(detailed_rooms)} available rooms")
+        logger.info("Found %s available rooms", len(detailed_rooms))
         return result
         
     except Exception as e:
-        logging.error(f"Error fetching available rooms: {e}")
+        logger.error("Error fetching available rooms: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching rooms: {str(e)}")
 
 # ============================================
@@ -327,71 +387,92 @@ async def get_available_rooms(
 @router.get("/room-types-with-availability")
 async def get_room_types_with_availability():
     """Get all room types with their current availability status (for today/tomorrow in PKT)"""
-    cache_key = "room_types_with_availability"
+    cache_key = CacheManager.ROOM_TYPES_WITH_AVAILABILITY_KEY.format(
+        pkt_day=get_pkt_today().isoformat()
+    )
     cached_data = CacheManager.get_cache(cache_key)
     if cached_data:
         return cached_data
     
     try:
+        # Fast path: the precomputed materialized view
+        # (sql/room_types_availability_mv.sql) already holds the full
+        # payload - one indexed scan instead of the per-type fan-out below
+        try:
+            mv_result = await (
+                supabase_async.table("mv_room_types_availability")
+                .select("*")
+                .execute()
+            )
+            if mv_result.data:
+                room_types = [
+                    {
+                        "id": row["id"],
+                        "name": row["name"],
+                        "base_price": row["base_price"],
+                        "is_available": row["available_rooms_count"] > 0,
+                        "available_rooms_count": row["available_rooms_count"],
+                        "total_rooms_count": row["total_rooms_count"],
+                        "status_breakdown": row["status_breakdown"],
+                        "max_adults": row["max_adults"],
+                        "max_children": row["max_children"],
+                        "total_capacity": row["total_capacity"],
+                        "amenities": row["amenities"] or []
+                    }
+                    for row in mv_result.data
+                ]
+                CacheManager.set_cache(cache_key, room_types, CacheManager.AVAILABILITY_TTL)
+                return room_types
+        except Exception as mv_error:
+            logger.warning("mv_room_types_availability unavailable, computing live: %s", mv_error)
+
         pkt_today = get_pkt_today()
         pkt_tomorrow = pkt_today + timedelta(days=1)
-        
-        result = await asyncio.to_thread(
-            lambda: supabase.table("room_types")
-            .select("*")
-            .execute()
+
+        all_room_types = await get_room_types_cached()
+
+        # Status counts aggregated in SQL (one GROUP BY scan), gathered
+        # together with the per-type availability checks
+        status_by_type, *availability_lists = await asyncio.gather(
+            _room_status_counts(),
+            *(
+                _available_rooms_limited(rt["id"], pkt_today, pkt_tomorrow, rt["name"])
+                for rt in all_room_types
+            )
         )
-        
+
         room_types = []
-        for room_type in result.data:
-            available_rooms = await get_available_rooms_optimized(
-                room_type_id=room_type["id"],
-                check_in=pkt_today,
-                check_out=pkt_tomorrow
-            )
-            
-            total_rooms_result = await asyncio.to_thread(
-                lambda: supabase.table("rooms")
-                .select("room_number, status")
-                .eq("room_type_id", room_type["id"])
-                .execute()
-            )
-            
-            rooms_data = total_rooms_result.data or []
-            total_rooms_count = len(rooms_data)
-            
-            available_count = len([r for r in rooms_data if r["status"] == "Available"])
-            booked_count = len([r for r in rooms_data if r["status"] == "Booked"])
-            occupied_count = len([r for r in rooms_data if r["status"] == "Occupied"])
-            maintenance_count = len([r for r in rooms_data if r["status"] == "Maintenance"])
-            
-            max_adults = room_type.get("max_adults", 2)
-            max_children = room_type.get("max_children", 1)
-            
+        for room_type, available_rooms in zip(all_room_types, availability_lists):
+            status_counts = status_by_type.get(room_type["id"], Counter())
+
+            get = room_type.get
+            max_adults = get("max_adults", 2)
+            max_children = get("max_children", 1)
+
             room_types.append({
                 "id": room_type["id"],
                 "name": room_type["name"],
                 "base_price": room_type["base_price"],
                 "is_available": len(available_rooms) > 0,
                 "available_rooms_count": len(available_rooms),
-                "total_rooms_count": total_rooms_count,
+                "total_rooms_count": sum(status_counts.values()),
                 "status_breakdown": {
-                    "available": available_count,
-                    "booked": booked_count,
-                    "occupied": occupied_count,
-                    "maintenance": maintenance_count
+                    "available": status_counts["Available"],
+                    "booked": status_counts["Booked"],
+                    "occupied": status_counts["Occupied"],
+                    "maintenance": status_counts["Maintenance"]
                 },
                 "max_adults": max_adults,
                 "max_children": max_children,
                 "total_capacity": max_adults + max_children,
-                "amenities": room_type.get("amenities", [])
+                "amenities": get("amenities", [])
             })
         
         CacheManager.set_cache(cache_key, room_types, CacheManager.AVAILABILITY_TTL)
         return room_types
         
     except Exception as e:
-        logging.error(f"Error getting room types with availability: {e}")
+        logger.error("Error getting room types with availability: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============================================
@@ -405,8 +486,8 @@ async def get_room_type_by_id(room_type_id: int):
     Used by the booking page to display room information.
     """
     try:
-        result = await asyncio.to_thread(
-            lambda: supabase.table("room_types")
+        result = await (
+            supabase_async.table("room_types")
             .select("*")
             .eq("id", room_type_id)
             .single()
@@ -421,5 +502,5 @@ async def get_room_type_by_id(room_type_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error fetching room type by ID: {e}")
+        logger.error("Error fetching room type by ID: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch room type")
\ No newline at end of file
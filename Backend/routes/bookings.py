@@ -2,19 +2,22 @@
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
 from models.booking import FrontendBookingRequest, BookingResponse, AdminBookingRequest
 from routes.notifications import trigger_booking_created, trigger_booking_cancelled
-from supabase_client import supabase
+from supabase_client import supabase, supabase_async, retry_db
 from datetime import datetime, date, timedelta, timezone, time
 from typing import List
+from collections import defaultdict
 import logging
 import asyncio
 from utils.cache_helper import CacheManager, get_billing_settings_cached
-from routes.availability_routes import (
-       check_room_availability,
-       get_available_rooms_optimized
-   )
+# get_pkt_today is the memoized variant (one tz conversion per 30s
+# window) rather than a fresh conversion per call
+from routes.availability_routes import get_available_rooms_optimized, get_pkt_today
 
 router = APIRouter()
-logging.basicConfig(level=logging.INFO)
+# Logging is configured once in main.py; modules just grab a named logger
+logger = logging.getLogger(__name__)
+
+UTC = timezone.utc
 
 # ============================================
 # CONSTANTS
@@ -33,6 +36,13 @@ CHECK_IN_TIME_OPTIONS = [
     "15:00",  # 3 PM
 ]
 
+# Never changes at runtime - build the response once at import time
+CHECK_IN_TIME_RESPONSE = {
+    "options": CHECK_IN_TIME_OPTIONS,
+    "default": DEFAULT_CHECK_IN_TIME.strftime("%H:%M"),
+    "check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M")
+}
+
 # ============================================
 # TIMEZONE UTILITIES
 # ============================================
@@ -40,25 +50,64 @@ CHECK_IN_TIME_OPTIONS = [
 def utc_to_pkt(utc_dt: datetime) -> datetime:
     """Convert UTC datetime to PKT (UTC+5)"""
     if utc_dt.tzinfo is None:
-        utc_dt = utc_dt.replace(tzinfo=timezone.utc)
+        utc_dt = utc_dt.replace(tzinfo=UTC)
     else:
-        utc_dt = utc_dt.astimezone(timezone.utc)
+        utc_dt = utc_dt.astimezone(UTC)
     return utc_dt + timedelta(hours=5)
 
-def get_pkt_today() -> date:
-    """Get current date in PKT timezone"""
-    return utc_to_pkt(datetime.utcnow()).date()
-
 def get_pkt_now() -> datetime:
     """Get current datetime in PKT timezone"""
-    return utc_to_pkt(datetime.utcnow())
+    return utc_to_pkt(datetime.now(UTC))
+
+def _as_date(v) -> date:
+    """Coerce a Supabase date value (ISO string or date) to a date."""
+    return v if isinstance(v, date) else date.fromisoformat(v)
+
+# ============================================
+# HELPER: THREAD-POOL DB SHIMS
+# ============================================
+
+# Named module-level callables for asyncio.to_thread instead of per-call
+# lambdas: no closure allocated per request, and tracebacks name the
+# operation instead of "<lambda>"
+
+def _db_insert(table: str, data: dict):
+    return supabase.table(table).insert(data).execute()
+
+def _db_update(table: str, data: dict, key: str, value):
+    return supabase.table(table).update(data).eq(key, value).execute()
+
+def _db_delete(table: str, key: str, value):
+    return supabase.table(table).delete().eq(key, value).execute()
+
+def _db_set_room_status(room_number: str, status: str):
+    return supabase.table("rooms").update({"status": status}).eq("room_number", room_number).execute()
 
 # ============================================
 # HELPER: BOOKING ID GENERATION
 # ============================================
 
 async def generate_next_booking_id() -> str:
-    """Generate next sequential booking ID (e.g., BK001, BK002)"""
+    """Generate next sequential booking ID (e.g., BK001, BK002).
+
+    Prefers the next_booking_id sequence RPC
+    (sql/booking_id_sequence.sql): nextval() is atomic, so two
+    concurrent bookings can never collide the way the read-and-increment
+    scan below can. The scan stays as a fallback until the sequence is
+    installed.
+    """
+    try:
+        # Idempotent enough to retry: a burnt sequence value just leaves
+        # a gap in the ids
+        result = await retry_db(lambda: supabase_async.rpc("next_booking_id", {}).execute())
+        data = result.data
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if data:
+            return data
+    except Exception as rpc_error:
+        logger.warning("next_booking_id RPC unavailable, using order-by scan: %s", rpc_error)
+
     result = await asyncio.to_thread(
         lambda: supabase.table("bookings")
         .select("booking_id")
@@ -66,13 +115,129 @@ async def generate_next_booking_id() -> str:
         .limit(1)
         .execute()
     )
-    
+
     if result.data:
         last_id = int(result.data[0]["booking_id"][2:])
         return f"BK{str(last_id + 1).zfill(3)}"
     return "BK001"
 
 
+async def _reserve_booking_ids(count: int) -> List[str]:
+    """Reserve a block of consecutive booking ids in one call.
+
+    The next_booking_ids RPC advances the sequence atomically, so a
+    concurrent single booking can never land inside the block; the
+    fallback derives the block from the last issued id.
+    """
+    try:
+        result = await supabase_async.rpc("next_booking_ids", {"p_count": count}).execute()
+        if result.data:
+            return list(result.data)
+    except Exception as rpc_error:
+        logger.warning("next_booking_ids RPC unavailable, deriving block from last id: %s", rpc_error)
+
+    first_id = await generate_next_booking_id()
+    start = int(first_id[2:])
+    return [f"BK{str(start + i).zfill(3)}" for i in range(count)]
+
+
+# ============================================
+# HELPER: BULK BOOKING INSERT
+# ============================================
+
+async def bulk_insert_bookings(rows: List[dict]) -> None:
+    """Insert many bookings in one round trip.
+
+    PostgREST accepts a list payload natively, so N rows cost one HTTP
+    request instead of N. Use this from any admin path that creates
+    several bookings at once (group reservations, imports);
+    returning="minimal" skips echoing the rows back.
+    """
+    if not rows:
+        return
+    await supabase_async.table("bookings").insert(rows, returning="minimal").execute()
+
+
+# ============================================
+# HELPER: BOOKING ROLLBACK
+# ============================================
+
+async def _rollback_booking(booking_id: str, room_number: str = None):
+    """Undo a half-created booking: delete the row and free the room.
+
+    One rollback_booking RPC (sql/rollback_booking_rpc.sql) instead of
+    two sequential calls - the failure path fires exactly when the DB is
+    under stress, so it should cost as little as possible. Falls back to
+    the two-step cleanup until the function is installed. Never raises.
+    """
+    try:
+        await supabase_async.rpc("rollback_booking", {
+            "p_booking_id": booking_id,
+            "p_room_number": room_number
+        }).execute()
+        logger.info("🧹 Rolled back booking %s (RPC)", booking_id)
+        return
+    except Exception as rpc_error:
+        logger.warning("rollback_booking RPC unavailable, using two-step cleanup: %s", rpc_error)
+
+    try:
+        await asyncio.to_thread(_db_delete, "bookings", "booking_id", booking_id)
+        logger.info("🧹 Rolled back booking %s", booking_id)
+
+        # Reset room status if it was changed
+        if room_number:
+            await asyncio.to_thread(_db_set_room_status, room_number, "Available")
+    except Exception as rollback_error:
+        logger.error("Rollback error: %s", rollback_error)
+
+async def _rollback_admin_booking(booking_id: str, room_number: str = None):
+    """Undo a half-created admin booking: billing row, booking and room.
+
+    One rollback_admin_booking RPC (sql/rollback_admin_booking_rpc.sql)
+    instead of three sequential calls. Falls back to the step-by-step
+    cleanup until the function is installed. Never raises.
+    """
+    try:
+        await supabase_async.rpc("rollback_admin_booking", {
+            "p_booking_id": booking_id,
+            "p_room_number": room_number
+        }).execute()
+        logger.info("🧹 Rolled back admin booking %s (RPC)", booking_id)
+        return
+    except Exception as rpc_error:
+        logger.warning("rollback_admin_booking RPC unavailable, using step-by-step cleanup: %s", rpc_error)
+
+    try:
+        await asyncio.to_thread(_db_delete, "billing", "booking_id", booking_id)
+        await asyncio.to_thread(_db_delete, "bookings", "booking_id", booking_id)
+        if room_number:
+            await asyncio.to_thread(_db_set_room_status, room_number, "Available")
+        logger.info("🧹 Rolled back admin booking %s", booking_id)
+    except Exception as rollback_error:
+        logger.error("Rollback error: %s", rollback_error)
+
+async def _post_booking_side_effects(booking_id: str, guest_name: str, room_number: str, status: str, user_id=None):
+    """Run the post-create side effects (notification + cache
+    invalidation) in one background task instead of scheduling two."""
+    try:
+        await trigger_booking_created(
+            booking_id=booking_id,
+            guest_name=guest_name,
+            room_number=room_number,
+            status=status
+        )
+    except Exception as notify_error:
+        logger.warning("Booking-created notification failed for %s: %s", booking_id, notify_error)
+    try:
+        await asyncio.to_thread(
+            lambda: CacheManager.invalidate_booking_related_cache(
+                room_number=room_number,
+                user_id=user_id
+            )
+        )
+    except Exception as cache_error:
+        logger.warning("Cache invalidation failed for %s: %s", booking_id, cache_error)
+
 # ============================================
 # HELPER: UPDATE ROOM STATUS BASED ON DATE
 # ============================================
@@ -93,37 +258,60 @@ async def update_room_status_based_on_date(
     
     # Only update for confirmed or pending bookings
     if booking_status not in ["confirmed", "pending"]:
-        logging.info(f"🚫 Booking status is {booking_status} - no room status update")
+        logger.info("🚫 Booking status is %s - no room status update", booking_status)
         return
     
     if check_in_date == pkt_today:
         # Check-in is today - mark as Occupied (for confirmed bookings only)
         if booking_status == "confirmed":
             new_status = "Occupied"
-            logging.info(f"🏨 Check-in is TODAY ({pkt_today}) - marking room {room_number} as {new_status}")
+            logger.info("🏨 Check-in is TODAY (%s) - marking room %s as %s", pkt_today, room_number, new_status)
             
-            await asyncio.to_thread(
-                lambda: supabase.table("rooms")
-                .update({"status": new_status})
-                .eq("room_number", room_number)
-                .execute()
-            )
+            await asyncio.to_thread(_db_set_room_status, room_number, new_status)
         else:
-            logging.info(f"🕒 Check-in is TODAY but status is {booking_status} - no update")
+            logger.info("🕒 Check-in is TODAY but status is %s - no update", booking_status)
     
     elif check_in_date > pkt_today:
         # Future booking - mark as Booked
         new_status = "Booked"
-        logging.info(f"📅 Check-in is FUTURE ({check_in_date}) - marking room {room_number} as {new_status}")
+        logger.info("📅 Check-in is FUTURE (%s) - marking room %s as %s", check_in_date, room_number, new_status)
         
-        await asyncio.to_thread(
-            lambda: supabase.table("rooms")
-            .update({"status": new_status})
-            .eq("room_number", room_number)
-            .execute()
-        )
+        await asyncio.to_thread(_db_set_room_status, room_number, new_status)
     else:
-        logging.info(f"🕒 Check-in is in the PAST ({check_in_date}) - no room status update")
+        logger.info("🕒 Check-in is in the PAST (%s) - no room status update", check_in_date)
+
+# ============================================
+# HELPER: CUSTOMER BOOKING RPC
+# ============================================
+
+async def _try_create_customer_booking_rpc(payload: dict) -> dict:
+    """Call the create_customer_booking function: room-type lookup,
+    locked room selection, booking insert and room-status flip in ONE
+    round trip.
+
+    Returns the result row, raises HTTPException for business-rule
+    violations raised inside the function, or returns None when the
+    function is not installed so the caller can fall back to the Python
+    orchestration.
+    """
+    try:
+        result = await supabase_async.rpc("create_customer_booking", {"payload": payload}).execute()
+    except Exception as rpc_error:
+        error_msg = str(rpc_error)
+        if "ROOM_TYPE_NOT_FOUND" in error_msg:
+            raise HTTPException(status_code=404, detail="Room type not found")
+        if "NO_ROOM_AVAILABLE" in error_msg:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No rooms available from {payload['check_in']} to {payload['check_out']}"
+            )
+        logger.warning("create_customer_booking RPC unavailable, using Python orchestration: %s", rpc_error)
+        return None
+
+    data = result.data
+    if isinstance(data, list):
+        data = data[0] if data else None
+    return data
 
 # ============================================
 # ENDPOINT: CUSTOMER BOOKING CREATION
@@ -140,14 +328,14 @@ async def create_customer_booking(
     - Future bookings: room marked as "Booked"
     - Today's bookings: room stays "Available" until payment confirmation
     """
-    logging.info("📥 Customer booking request received")
+    logger.info("📥 Customer booking request received")
     inserted_booking_id = None
     room_number = None
     
     try:
-        # Parse dates
-        check_in_date = datetime.fromisoformat(booking_request.check_in).date()
-        check_out_date = datetime.fromisoformat(booking_request.check_out).date()
+        # Dates were already parsed (and cached) by the request validator
+        check_in_date = booking_request.check_in_date
+        check_out_date = booking_request.check_out_date
         
         # Parse check-in time (default to noon if not provided)
         check_in_time_str = getattr(booking_request, 'check_in_time', None)
@@ -155,110 +343,125 @@ async def create_customer_booking(
             check_in_time_obj = datetime.strptime(check_in_time_str, "%H:%M").time()
         else:
             check_in_time_obj = DEFAULT_CHECK_IN_TIME
-        
-        # Parallel fetch: room type and billing settings
-        room_type_task = asyncio.to_thread(
-            lambda: supabase.table("room_types")
-            .select("*")
-            .eq("id", booking_request.room_type_id)
-            .execute()
-        )
-        billing_settings_task = get_billing_settings_cached()
-        
-        room_type_result, _ = await asyncio.gather(room_type_task, billing_settings_task)
-        
-        if not room_type_result.data:
-            raise HTTPException(status_code=404, detail="Room type not found")
-        
-        room_type = room_type_result.data[0]
-        
-        # Get available rooms (optimized)
-        available_rooms = await get_available_rooms_optimized(
-            room_type["id"], check_in_date, check_out_date
-        )
-        
-        if not available_rooms:
-            raise HTTPException(
-                status_code=400,
-                detail=f"No rooms available for '{room_type['name']}' from {check_in_date} to {check_out_date}"
-            )
-        
-        # Select first available room
-        selected_room = available_rooms[0]
-        room_number = selected_room["room_number"]
-        
-        # Double-check availability
-        is_available = await check_room_availability(room_number, check_in_date, check_out_date)
-        if not is_available:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Room {room_number} just became unavailable. Please try again."
-            )
-        
-        # Generate booking ID
+
+        # Guest name split / phone parse were cached by the request validator
+        first_name = booking_request.first_name
+        last_name = booking_request.last_name
+
         booking_id = await generate_next_booking_id()
-        inserted_booking_id = booking_id
-        
-        # Calculate total
-        nights = (check_out_date - check_in_date).days or 1
-        calculated_total = nights * room_type["base_price"]
-        total_amount = booking_request.total_amount if abs(booking_request.total_amount - calculated_total) <= calculated_total * 0.1 else calculated_total
-        
-        # Split guest name
-        name_parts = booking_request.guest_name.split(" ", 1)
-        first_name = name_parts[0]
-        last_name = name_parts[1] if len(name_parts) > 1 else ""
-        
-        # Insert booking with check-in time
-        booking_data = {
+        now_iso = datetime.now(UTC).isoformat()
+
+        # Fast path: one transactional RPC does room-type lookup, locked
+        # room selection, total validation, the insert and the
+        # room-status flip - nothing to roll back from Python on failure
+        rpc_row = await _try_create_customer_booking_rpc({
             "booking_id": booking_id,
+            "room_type_id": booking_request.room_type_id,
             "check_in": booking_request.check_in,
             "check_out": booking_request.check_out,
             "check_in_time": check_in_time_obj.strftime("%H:%M"),
             "check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M"),
             "guests": getattr(booking_request, 'guests', 2) or 2,
-            "room_number": room_number,
-            "room_type": selected_room["room_type"] or room_type["name"],
             "first_name": first_name,
             "last_name": last_name,
             "email": booking_request.guest_email,
-            "phone": int(booking_request.guest_phone) if booking_request.guest_phone and booking_request.guest_phone.isdigit() else 0,
-            "status": "pending",
-            "source": "Direct",
+            "phone": booking_request.phone_int,
             "user_id": booking_request.user_id,
             "special_requests": getattr(booking_request, 'special_requests', ''),
-            "is_updated": False,
-            "is_cancelled": False,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        await asyncio.to_thread(
-            lambda: supabase.table("bookings").insert(booking_data).execute()
-        )
-        
-        logging.info(f"✅ Customer booking {booking_id} created (status: pending)")
-        
-        # 🔥 UPDATE ROOM STATUS - For future bookings, mark as "Booked"
-        # For today's booking, keep as Available until payment
-        await update_room_status_based_on_date(room_number, check_in_date, "pending", "customer_booking_api")
+            "total_amount": booking_request.total_amount,
+            "created_at": now_iso
+        })
+
+        if rpc_row is not None:
+            room_number = rpc_row["room_number"]
+            total_amount = rpc_row["total_amount"]
+            logger.info("✅ Customer booking %s created (status: pending, RPC)", booking_id)
+        else:
+            # Fallback: Python orchestration of the same steps
+            # Parallel fetch: room type (in-process cached) and billing settings
+            room_type, _ = await asyncio.gather(
+                CacheManager.get_room_type_cached(booking_request.room_type_id),
+                get_billing_settings_cached()
+            )
+
+            if not room_type:
+                raise HTTPException(status_code=404, detail="Room type not found")
+
+            available_rooms = await get_available_rooms_optimized(
+                room_type["id"], check_in_date, check_out_date, room_type["name"]
+            )
+
+            if not available_rooms:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"No rooms available for '{room_type['name']}' from {check_in_date} to {check_out_date}"
+                )
+
+            # Select first available room. No second availability round-trip
+            # here: get_available_rooms_optimized already verified this room
+            # against the same date window.
+            selected_room = available_rooms[0]
+            room_number = selected_room["room_number"]
+
+            inserted_booking_id = booking_id
+
+            # Calculate total (nights was derived by the request validator)
+            nights = booking_request.nights
+            calculated_total = nights * room_type["base_price"]
+            total_amount = booking_request.total_amount if abs(booking_request.total_amount - calculated_total) <= calculated_total * 0.1 else calculated_total
+
+            # Insert booking with check-in time
+            booking_data = {
+                "booking_id": booking_id,
+                "check_in": booking_request.check_in,
+                "check_out": booking_request.check_out,
+                "check_in_time": check_in_time_obj.strftime("%H:%M"),
+                "check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M"),
+                "guests": getattr(booking_request, 'guests', 2) or 2,
+                "room_number": room_number,
+                "room_type": selected_room["room_type"] or room_type["name"],
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": booking_request.guest_email,
+                "phone": booking_request.phone_int,
+                "status": "pending",
+                "source": "Direct",
+                "user_id": booking_request.user_id,
+                "special_requests": getattr(booking_request, 'special_requests', ''),
+                "is_updated": False,
+                "is_cancelled": False,
+                "created_at": now_iso
+            }
+
+            # Insert + room-status transition in one round trip via RPC
+            # (sql/booking_insert_rpc.sql); falls back to the two-step path
+            # when the function is not installed yet
+            created_via_rpc = False
+            try:
+                await supabase_async.rpc(
+                    "insert_booking_with_room_status", {"p_booking": booking_data}
+                ).execute()
+                created_via_rpc = True
+            except Exception as rpc_error:
+                logger.warning("⚠️ insert_booking_with_room_status RPC unavailable, falling back: %s", rpc_error)
+
+            if not created_via_rpc:
+                await asyncio.to_thread(_db_insert, "bookings", booking_data)
+
+                # 🔥 UPDATE ROOM STATUS - For future bookings, mark as "Booked"
+                # For today's booking, keep as Available until payment
+                await update_room_status_based_on_date(room_number, check_in_date, "pending", "customer_booking_api")
+
+            logger.info("✅ Customer booking %s created (status: pending)", booking_id)
         
-        # Trigger notification (non-blocking)
+        # Notification + cache invalidation in one background task
         asyncio.create_task(
-            trigger_booking_created(
+            _post_booking_side_effects(
                 booking_id=booking_id,
                 guest_name=f"{first_name} {last_name}",
                 room_number=room_number,
-                status="pending"
-            )
-        )
-        
-        # Cache invalidation (non-blocking)
-        asyncio.create_task(
-            asyncio.to_thread(
-                lambda: CacheManager.invalidate_booking_related_cache(
-                    room_number=room_number,
-                    user_id=booking_request.user_id
-                )
+                status="pending",
+                user_id=booking_request.user_id
             )
         )
         
@@ -278,32 +481,89 @@ async def create_customer_booking(
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"❌ Error creating customer booking: {e}")
+        logger.error("❌ Error creating customer booking: %s", e)
         
         # Rollback on error
         if inserted_booking_id:
-            try:
-                await asyncio.to_thread(
-                    lambda: supabase.table("bookings")
-                    .delete()
-                    .eq("booking_id", inserted_booking_id)
-                    .execute()
-                )
-                logging.info(f"🧹 Rolled back booking {inserted_booking_id}")
-                
-                # Reset room status if it was changed
-                if room_number:
-                    await asyncio.to_thread(
-                        lambda: supabase.table("rooms")
-                        .update({"status": "Available"})
-                        .eq("room_number", room_number)
-                        .execute()
-                    )
-            except Exception as rollback_error:
-                logging.error(f"Rollback error: {rollback_error}")
-        
+            await _rollback_booking(inserted_booking_id, room_number)
+
         raise HTTPException(status_code=500, detail=f"Booking failed: {str(e)}")
 
+# ============================================
+# HELPER: ADMIN BOOKING RPC
+# ============================================
+
+def _resolve_admin_check_in_time(booking_data: AdminBookingRequest) -> time:
+    """Pick the check-in time: explicit value, current PKT time for
+    today's walk-ins, or the default for future bookings."""
+    if booking_data.check_in_time:
+        return datetime.strptime(booking_data.check_in_time, "%H:%M").time()
+    if booking_data.check_in_date == get_pkt_today():
+        return get_pkt_now().time()
+    return DEFAULT_CHECK_IN_TIME
+
+def _admin_booking_rpc_payload(booking_data: AdminBookingRequest, booking_id: str,
+                               check_in_time_obj: time, now_iso: str) -> dict:
+    """Build the jsonb payload consumed by the create_admin_booking RPC
+    (and, row by row, by its bulk variant)."""
+    return {
+        "booking_id": booking_id,
+        "room_type_id": booking_data.room_type_id,
+        "room_number": booking_data.room_number or "",
+        "check_in": booking_data.check_in,
+        "check_out": booking_data.check_out,
+        "check_in_time": check_in_time_obj.strftime("%H:%M"),
+        "check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M"),
+        "guests": booking_data.guests or 2,
+        "first_name": booking_data.first_name,
+        "last_name": booking_data.last_name,
+        "email": booking_data.guest_email,
+        "phone": booking_data.phone_int,
+        "status": booking_data.status,
+        "user_id": booking_data.user_id,
+        "special_requests": booking_data.special_requests or "",
+        "total_amount": booking_data.total_amount or 0,
+        "payment_method": booking_data.payment_method or "Admin",
+        "payment_status": booking_data.payment_status or "Pending",
+        "created_at": now_iso
+    }
+
+async def _try_create_admin_booking_rpc(payload: dict) -> dict:
+    """Attempt the transactional create_admin_booking RPC
+    (sql/admin_booking_rpc.sql): room-type lookup, locked room selection,
+    booking + billing inserts and room-status flip in ONE round trip.
+
+    Returns the result row, raises HTTPException for business-rule
+    violations raised inside the function, or returns None when the
+    function is not installed so the caller can fall back to the Python
+    orchestration.
+    """
+    try:
+        result = await supabase_async.rpc("create_admin_booking", {"payload": payload}).execute()
+    except Exception as rpc_error:
+        error_msg = str(rpc_error)
+        if "ROOM_TYPE_NOT_FOUND" in error_msg:
+            raise HTTPException(status_code=404, detail="Room type not found")
+        if "ROOM_NOT_AVAILABLE" in error_msg:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Room {payload['room_number']} is not available for selected dates"
+            )
+        if "NO_ROOM_AVAILABLE" in error_msg:
+            # 409: every candidate room is either booked or currently
+            # locked by a concurrent transaction - retrying may succeed
+            raise HTTPException(
+                status_code=409,
+                detail=f"No rooms available from {payload['check_in']} to {payload['check_out']}"
+            )
+        logger.warning("create_admin_booking RPC unavailable, using Python orchestration: %s", rpc_error)
+        return None
+
+    data = result.data
+    if isinstance(data, list):
+        data = data[0] if data else None
+    return data
+
 # ============================================
 # ENDPOINT: ADMIN BOOKING CREATION
 # ============================================
@@ -317,172 +577,149 @@ async def create_admin_booking(booking_data: AdminBookingRequest):
     - Future confirmed bookings: room marked as "Booked"
     - Today's confirmed bookings: room marked as "Occupied"
     """
-    logging.info("📥 Admin booking request received")
+    logger.info("📥 Admin booking request received")
     inserted_booking_id = None
     inserted_billing_id = None
     room_number = None
     
     try:
-        # Parse dates
-        check_in_date = datetime.fromisoformat(booking_data.check_in).date()
-        check_out_date = datetime.fromisoformat(booking_data.check_out).date()
-        
-        pkt_today = get_pkt_today()
-        is_today_booking = (check_in_date == pkt_today)
-        
-        # Parse check-in time
-        # For walk-in/today bookings, allow custom check-in time
-        check_in_time_str = getattr(booking_data, 'check_in_time', None)
-        if check_in_time_str:
-            check_in_time_obj = datetime.strptime(check_in_time_str, "%H:%M").time()
-        else:
-            # Use current time for today's bookings, default for future
-            if is_today_booking:
-                pkt_now = get_pkt_now()
-                check_in_time_obj = pkt_now.time()
-            else:
-                check_in_time_obj = DEFAULT_CHECK_IN_TIME
-        
-        # Parallel fetch: room type and billing settings
-        room_type_task = asyncio.to_thread(
-            lambda: supabase.table("room_types")
-            .select("*")
-            .eq("id", booking_data.room_type_id)
-            .execute()
-        )
-        billing_settings_task = get_billing_settings_cached()
-        
-        room_type_result, billing_settings = await asyncio.gather(room_type_task, billing_settings_task)
-        
-        if not room_type_result.data:
-            raise HTTPException(status_code=404, detail="Room type not found")
+        # Dates were already parsed (and cached) by the request validator
+        check_in_date = booking_data.check_in_date
+        check_out_date = booking_data.check_out_date
         
-        room_type = room_type_result.data[0]
-        
-        # Get available rooms
-        available_rooms = await get_available_rooms_optimized(
-            room_type["id"], check_in_date, check_out_date
+        check_in_time_obj = _resolve_admin_check_in_time(booking_data)
+
+        # Guest name split / phone parse were cached by the request validator
+        first_name = booking_data.first_name
+        last_name = booking_data.last_name
+
+        # Generate booking ID (consumed by both the RPC and the fallback)
+        booking_id = await generate_next_booking_id()
+
+        # One timestamp shared by both inserts in this request
+        now_iso = datetime.now(UTC).isoformat()
+
+        # Fast path: one transactional RPC does room-type lookup, locked
+        # room selection, booking + billing inserts and the room-status
+        # flip - nothing to roll back from Python on failure
+        rpc_row = await _try_create_admin_booking_rpc(
+            _admin_booking_rpc_payload(booking_data, booking_id, check_in_time_obj, now_iso)
         )
-        
-        if not available_rooms:
-            raise HTTPException(
-                status_code=400,
-                detail=f"No rooms available for '{room_type['name']}' from {check_in_date} to {check_out_date}"
+
+        if rpc_row is not None:
+            room_number = rpc_row["room_number"]
+            final_total = rpc_row["total_amount"]
+            inserted_billing_id = rpc_row.get("billing_id")
+            logger.info("✅ Admin booking %s created (status: %s, RPC)", booking_id, booking_data.status)
+        else:
+            # Fallback: Python orchestration of the same steps
+            # Parallel fetch: room type and billing settings
+            room_type, billing_settings = await asyncio.gather(
+                CacheManager.get_room_type_cached(booking_data.room_type_id),
+                get_billing_settings_cached()
             )
-        
-        # Select room (admin can specify room_number)
-        if booking_data.room_number:
-            selected_room = next(
-                (r for r in available_rooms if r["room_number"] == booking_data.room_number),
-                None
+
+            if not room_type:
+                raise HTTPException(status_code=404, detail="Room type not found")
+
+            # Get available rooms
+            available_rooms = await get_available_rooms_optimized(
+                room_type["id"], check_in_date, check_out_date, room_type["name"]
             )
-            if not selected_room:
+
+            if not available_rooms:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"Room {booking_data.room_number} is not available for selected dates"
+                    detail=f"No rooms available for '{room_type['name']}' from {check_in_date} to {check_out_date}"
                 )
-        else:
-            selected_room = available_rooms[0]
-        
-        room_number = selected_room["room_number"]
-        
-        # Generate booking ID
-        booking_id = await generate_next_booking_id()
-        inserted_booking_id = booking_id
-        
-        # Split guest name
-        name_parts = booking_data.guest_name.split(" ", 1)
-        first_name = name_parts[0]
-        last_name = name_parts[1] if len(name_parts) > 1 else ""
-        
-        # Calculate billing
-        nights = (check_out_date - check_in_date).days or 1
-        base_amount = room_type["base_price"] * nights
-        discount_amount = base_amount * (billing_settings["discount"] / 100)
-        vat_amount = (base_amount - discount_amount) * (billing_settings["vat"] / 100)
-        final_total = booking_data.total_amount if booking_data.total_amount > 0 else (base_amount - discount_amount + vat_amount)
-        
-        # Prepare booking data
-        booking_insert_data = {
-            "booking_id": booking_id,
-            "check_in": booking_data.check_in,
-            "check_out": booking_data.check_out,
-            "check_in_time": check_in_time_obj.strftime("%H:%M"),
-            "check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M"),
-            "guests": booking_data.guests or 2,
-            "room_number": room_number,
-            "room_type": selected_room["room_type"],
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": booking_data.guest_email,
-            "phone": int(booking_data.guest_phone) if booking_data.guest_phone and booking_data.guest_phone.isdigit() else 0,
-            "status": booking_data.status,
-            "source": "Admin",
-            "user_id": booking_data.user_id,
-            "is_updated": False,
-            "special_requests": booking_data.special_requests or "",
-            "is_cancelled": False,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        # Prepare billing data
-        billing_insert_data = {
-            "booking_id": booking_id,
-            "room_price": room_type["base_price"],
-            "discount": billing_settings["discount"],
-            "vat": billing_settings["vat"],
-            "total_amount": final_total,
-            "payment_method": booking_data.payment_method or "Admin",
-            "payment_status": booking_data.payment_status or "Pending",
-            "is_cancelled": False,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        # Insert booking first
-        booking_result = await asyncio.to_thread(
-            lambda: supabase.table("bookings").insert(booking_insert_data).execute()
-        )
-        
-        # Then insert billing (this ensures booking exists for foreign key)
-        try:
-            billing_result = await asyncio.to_thread(
-                lambda: supabase.table("billing").insert(billing_insert_data).execute()
-            )
-            if billing_result.data:
-                inserted_billing_id = billing_result.data[0]["id"]
-        except Exception as billing_error:
-            # If billing fails, rollback booking
-            logging.error(f"❌ Billing creation failed: {billing_error}")
-            await asyncio.to_thread(
-                lambda: supabase.table("bookings")
-                .delete()
-                .eq("booking_id", booking_id)
-                .execute()
-            )
-            raise HTTPException(status_code=500, detail=f"Billing creation failed: {str(billing_error)}")
-        
-        logging.info(f"✅ Admin booking {booking_id} created (status: {booking_data.status})")
-        
-        # 🔥 UPDATE ROOM STATUS based on check-in date and booking status
-        await update_room_status_based_on_date(room_number, check_in_date, booking_data.status, "admin_booking_api")
+
+            # Select room (admin can specify room_number)
+            if booking_data.room_number:
+                selected_room = next(
+                    (r for r in available_rooms if r["room_number"] == booking_data.room_number),
+                    None
+                )
+                if not selected_room:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Room {booking_data.room_number} is not available for selected dates"
+                    )
+            else:
+                selected_room = available_rooms[0]
+
+            room_number = selected_room["room_number"]
+            inserted_booking_id = booking_id
+
+            # Calculate billing (nights was derived by the request validator)
+            nights = booking_data.nights
+            base_amount = room_type["base_price"] * nights
+            discount_amount = base_amount * (billing_settings["discount"] / 100)
+            vat_amount = (base_amount - discount_amount) * (billing_settings["vat"] / 100)
+            final_total = booking_data.total_amount if booking_data.total_amount > 0 else (base_amount - discount_amount + vat_amount)
+
+            # Prepare booking data
+            booking_insert_data = {
+                "booking_id": booking_id,
+                "check_in": booking_data.check_in,
+                "check_out": booking_data.check_out,
+                "check_in_time": check_in_time_obj.strftime("%H:%M"),
+                "check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M"),
+                "guests": booking_data.guests or 2,
+                "room_number": room_number,
+                "room_type": selected_room["room_type"],
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": booking_data.guest_email,
+                "phone": booking_data.phone_int,
+                "status": booking_data.status,
+                "source": "Admin",
+                "user_id": booking_data.user_id,
+                "is_updated": False,
+                "special_requests": booking_data.special_requests or "",
+                "is_cancelled": False,
+                "created_at": now_iso
+            }
+
+            # Prepare billing data
+            billing_insert_data = {
+                "booking_id": booking_id,
+                "room_price": room_type["base_price"],
+                "discount": billing_settings["discount"],
+                "vat": billing_settings["vat"],
+                "total_amount": final_total,
+                "payment_method": booking_data.payment_method or "Admin",
+                "payment_status": booking_data.payment_status or "Pending",
+                "is_cancelled": False,
+                "created_at": now_iso
+            }
+
+            # Insert booking first
+            booking_result = await asyncio.to_thread(_db_insert, "bookings", booking_insert_data)
+
+            # Then insert billing (this ensures booking exists for foreign key)
+            try:
+                billing_result = await asyncio.to_thread(_db_insert, "billing", billing_insert_data)
+                if billing_result.data:
+                    inserted_billing_id = billing_result.data[0]["id"]
+            except Exception as billing_error:
+                # If billing fails, rollback booking
+                logger.error("❌ Billing creation failed: %s", billing_error)
+                await asyncio.to_thread(_db_delete, "bookings", "booking_id", booking_id)
+                raise HTTPException(status_code=500, detail=f"Billing creation failed: {str(billing_error)}")
+
+            logger.info("✅ Admin booking %s created (status: %s)", booking_id, booking_data.status)
+
+            # 🔥 UPDATE ROOM STATUS based on check-in date and booking status
+            await update_room_status_based_on_date(room_number, check_in_date, booking_data.status, "admin_booking_api")
         
-        # Trigger notification (non-blocking)
+        # Notification + cache invalidation in one background task
         asyncio.create_task(
-            trigger_booking_created(
+            _post_booking_side_effects(
                 booking_id=booking_id,
                 guest_name=f"{first_name} {last_name}",
                 room_number=room_number,
-                status=booking_data.status
-            )
-        )
-        
-        # Cache invalidation (non-blocking)
-        asyncio.create_task(
-            asyncio.to_thread(
-                lambda: CacheManager.invalidate_booking_related_cache(
-                    room_number=room_number,
-                    user_id=booking_data.user_id
-                )
+                status=booking_data.status,
+                user_id=booking_data.user_id
             )
         )
         
@@ -498,77 +735,154 @@ async def create_admin_booking(booking_data: AdminBookingRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"❌ Error creating admin booking: {e}")
+        logger.error("❌ Error creating admin booking: %s", e)
         
-        # Comprehensive rollback
+        # Comprehensive rollback (fallback path only - the RPC fast path
+        # is a single transaction and never leaves partial rows behind)
         if inserted_booking_id:
-            try:
-                # Delete billing first (if created)
-                if inserted_billing_id:
-                    await asyncio.to_thread(
-                        lambda: supabase.table("billing")
-                        .delete()
-                        .eq("booking_id", inserted_booking_id)
-                        .execute()
-                    )
-                
-                # Then delete booking
-                await asyncio.to_thread(
-                    lambda: supabase.table("bookings")
-                    .delete()
-                    .eq("booking_id", inserted_booking_id)
-                    .execute()
-                )
-                
-                # Reset room status
-                if room_number:
-                    await asyncio.to_thread(
-                        lambda: supabase.table("rooms")
-                        .update({"status": "Available"})
-                        .eq("room_number", room_number)
-                        .execute()
-                    )
-                
-                logging.info(f"🧹 Rolled back admin booking {inserted_booking_id}")
-            except Exception as rollback_error:
-                logging.error(f"Rollback error: {rollback_error}")
-        
+            await _rollback_admin_booking(inserted_booking_id, room_number)
+
         raise HTTPException(status_code=500, detail=f"Admin booking failed: {str(e)}")
 
 
+@router.post("/admin/bookings/bulk")
+async def create_admin_bookings_bulk(bookings: List[AdminBookingRequest]):
+    """
+    Create many admin bookings (e.g. nightly imports) in ONE
+    transactional round trip via the create_admin_bookings_bulk RPC.
+    Room selection still locks rows per booking inside the transaction;
+    a failing row rolls back the whole batch.
+    """
+    if not bookings:
+        raise HTTPException(status_code=400, detail="No bookings provided")
+
+    try:
+        # One call reserves a sequential id block for the whole batch
+        booking_ids = await _reserve_booking_ids(len(bookings))
+        now_iso = datetime.now(UTC).isoformat()
+
+        payload = [
+            _admin_booking_rpc_payload(
+                booking_data,
+                booking_ids[i],
+                _resolve_admin_check_in_time(booking_data),
+                now_iso
+            )
+            for i, booking_data in enumerate(bookings)
+        ]
+
+        try:
+            result = await supabase_async.rpc(
+                "create_admin_bookings_bulk", {"payload": payload}
+            ).execute()
+        except Exception as rpc_error:
+            error_msg = str(rpc_error)
+            if "ROOM_TYPE_NOT_FOUND" in error_msg:
+                raise HTTPException(status_code=404, detail="Room type not found - batch rolled back")
+            if "ROOM_NOT_AVAILABLE" in error_msg or "NO_ROOM_AVAILABLE" in error_msg:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A booking in the batch had no available room - batch rolled back"
+                )
+            logger.error("❌ create_admin_bookings_bulk RPC failed: %s", rpc_error)
+            raise HTTPException(
+                status_code=503,
+                detail="Bulk booking requires the create_admin_bookings_bulk SQL function (sql/admin_bulk_booking_rpc.sql)"
+            )
+
+        rows = result.data or []
+
+        # One side-effects task per created booking
+        for booking_data, row in zip(bookings, rows):
+            asyncio.create_task(
+                _post_booking_side_effects(
+                    booking_id=row["booking_id"],
+                    guest_name=f"{booking_data.first_name} {booking_data.last_name}",
+                    room_number=row["room_number"],
+                    status=booking_data.status,
+                    user_id=booking_data.user_id
+                )
+            )
+
+        logger.info("✅ Bulk admin booking: %s bookings in one round trip", len(rows))
+        return {"success": True, "created": len(rows), "bookings": rows}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("❌ Error in bulk admin booking: %s", e)
+        raise HTTPException(status_code=500, detail=f"Bulk admin booking failed: {str(e)}")
+
+
+def _apply_user_search_filter(query, search_clean: str):
+    """Narrow the user search to the only column that can match.
+
+    All-digit input can never match an email and input containing
+    letters or '@' can never match a phone, so probe a single trigram
+    index instead of OR-ing both; ambiguous input keeps the OR.
+    """
+    if search_clean.isdigit():
+        return query.ilike("phone", f"%{search_clean}%")
+    if "@" in search_clean or any(c.isalpha() for c in search_clean):
+        return query.ilike("email", f"%{search_clean}%")
+    return query.or_(f"email.ilike.%{search_clean}%,phone.ilike.%{search_clean}%")
+
+
 @router.get("/users")
-def search_users(search: str = Query(..., min_length=2)):
+async def search_users(search: str = Query(..., min_length=2)):
     """Search users by email or phone number"""
     try:
-        logging.info(f"🔍 Searching users with term: '{search}'")
+        logger.info("🔍 Searching users with term: '%s'", search)
         
         search_clean = search.strip()
-        
-        result = supabase.table("users") \
-            .select("id, name, email, phone") \
-            .or_(f"email.ilike.%{search_clean}%,phone.ilike.%{search_clean}%") \
-            .limit(10) \
-            .execute()
-        
-        transformed_users = []
-        for user in result.data:
-            name_parts = user["name"].split(" ", 1) if user["name"] else ["", ""]
-            first_name = name_parts[0] if len(name_parts) > 0 else ""
-            last_name = name_parts[1] if len(name_parts) > 1 else ""
-            
-            transformed_users.append({
-                "id": user["id"],
-                "first_name": first_name,
-                "last_name": last_name,
-                "email": user["email"],
-                "phone": user["phone"] or ""
-            })
-        
-        logging.info(f"✅ Found {len(transformed_users)} users")
+
+        # The ILIKE filters are served by the trigram indexes from
+        # sql/users_search_indexes.sql; first_name/last_name are stored
+        # generated columns there, so the loop is a pure pass-through
+        try:
+            result = await asyncio.to_thread(
+                lambda: _apply_user_search_filter(
+                    supabase.table("users").select("id, first_name, last_name, email, phone"),
+                    search_clean
+                ).limit(10).execute()
+            )
+
+            transformed_users = [
+                {
+                    "id": user["id"],
+                    "first_name": user.get("first_name") or "",
+                    "last_name": user.get("last_name") or "",
+                    "email": user["email"],
+                    "phone": user["phone"] or ""
+                }
+                for user in result.data
+            ]
+        except Exception as column_error:
+            # Generated columns not installed yet - split in Python
+            logger.warning("users.first_name/last_name unavailable, splitting in Python: %s", column_error)
+            result = await asyncio.to_thread(
+                lambda: _apply_user_search_filter(
+                    supabase.table("users").select("id, name, email, phone"),
+                    search_clean
+                ).limit(10).execute()
+            )
+
+            transformed_users = []
+            for user in result.data:
+                name_parts = user["name"].split(" ", 1) if user["name"] else ["", ""]
+                transformed_users.append({
+                    "id": user["id"],
+                    "first_name": name_parts[0] if len(name_parts) > 0 else "",
+                    "last_name": name_parts[1] if len(name_parts) > 1 else "",
+                    "email": user["email"],
+                    "phone": user["phone"] or ""
+                })
+        
+        logger.info("✅ Found %s users", len(transformed_users))
         return {"users": transformed_users}
         
     except Exception as e:
-        logging.error(f"❌ Error searching users: {e}")
+        logger.error("❌ Error searching users: %s", e)
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"User search failed: {str(e)}")
@@ -584,34 +898,42 @@ async def trigger_booking_cleanup(background_tasks: BackgroundTasks):
             "message": "Booking cleanup triggered"
         }
     except Exception as e:
-        logging.error(f"❌ Error triggering cleanup: {e}")
+        logger.error("❌ Error triggering cleanup: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to trigger cleanup: {str(e)}")
 
 
 @router.get("/debug/rooms-and-types")
-def debug_rooms_and_types():
+async def debug_rooms_and_types():
     """Debug endpoint to check room types and rooms matching"""
     try:
-        room_types = supabase.table("room_types").select("*").execute()
-        rooms = supabase.table("rooms").select("*").execute()
-        
+        # Blocking Supabase calls go through to_thread so they don't
+        # stall the event loop; the two fetches are independent
+        room_types, rooms = await asyncio.gather(
+            asyncio.to_thread(lambda: supabase.table("room_types").select("*").execute()),
+            asyncio.to_thread(lambda: supabase.table("rooms").select("*").execute())
+        )
+
+        # Bucketize once by (room_type_id, status): linear in len(rooms)
+        # instead of four scans of the whole rooms list per room type
+        buckets = defaultdict(lambda: defaultdict(list))
+        for r in rooms.data:
+            by_status = buckets[r.get("room_type_id")]
+            by_status[r.get("status", "?")].append(r["room_number"])
+            by_status["_all"].append(r["room_number"])
+
         availability_info = []
         for rt in room_types.data:
-            available_rooms = [r for r in rooms.data if r.get("room_type_id") == rt["id"] and r.get("status") == "Available"]
-            booked_rooms = [r for r in rooms.data if r.get("room_type_id") == rt["id"] and r.get("status") == "Booked"]
-            occupied_rooms = [r for r in rooms.data if r.get("room_type_id") == rt["id"] and r.get("status") == "Occupied"]
-            total_rooms = [r for r in rooms.data if r.get("room_type_id") == rt["id"]]
-            
+            by_status = buckets[rt["id"]]
             availability_info.append({
                 "room_type": rt["name"],
                 "room_type_id": rt["id"],
-                "total_rooms": len(total_rooms),
-                "available_rooms": len(available_rooms),
-                "booked_rooms": len(booked_rooms),
-                "occupied_rooms": len(occupied_rooms),
-                "available_room_numbers": [r["room_number"] for r in available_rooms],
-                "booked_room_numbers": [r["room_number"] for r in booked_rooms],
-                "occupied_room_numbers": [r["room_number"] for r in occupied_rooms]
+                "total_rooms": len(by_status["_all"]),
+                "available_rooms": len(by_status["Available"]),
+                "booked_rooms": len(by_status["Booked"]),
+                "occupied_rooms": len(by_status["Occupied"]),
+                "available_room_numbers": by_status["Available"],
+                "booked_room_numbers": by_status["Booked"],
+                "occupied_room_numbers": by_status["Occupied"]
             })
         
         return {
@@ -623,9 +945,50 @@ def debug_rooms_and_types():
             "default_check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M")
         }
     except Exception as e:
-        logging.error(f"Error in debug endpoint: {e}")
+        logger.error("Error in debug endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _fetch_user_dashboard_stats(user_id: int = None, email: str = None) -> dict:
+    """Dashboard aggregates + booking rows in one round trip via the
+    get_user_dashboard RPC (sql/user_dashboard_rpc.sql).
+
+    Falls back to fetching all rows and counting in a single Python pass
+    until the function is installed.
+    """
+    try:
+        result = supabase.rpc("get_user_dashboard", {
+            "p_user_id": user_id,
+            "p_email": email
+        }).execute()
+        data = result.data
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if data is not None:
+            return data
+    except Exception as rpc_error:
+        logger.warning("get_user_dashboard RPC unavailable, aggregating in Python: %s", rpc_error)
+
+    query = supabase.table("user_bookings_simple").select("*")
+    query = query.eq("user_id", user_id) if user_id is not None else query.eq("email", email)
+    bookings = query.execute().data or []
+
+    total_bookings = len(bookings)
+    confirmed_bookings = 0
+    total_spent = 0.0
+    for b in bookings:
+        if b["status"] == "confirmed":
+            confirmed_bookings += 1
+        if b["status"] in ("confirmed", "completed"):
+            total_spent += float(b["total_amount"] or 0)
+
+    return {
+        "total_bookings": total_bookings,
+        "confirmed_bookings": confirmed_bookings,
+        "total_spent": total_spent,
+        "bookings": bookings
+    }
+
+
 @router.get("/user/{user_id}/dashboard")
 def get_user_dashboard(user_id: int):
     """Get simple user dashboard data"""
@@ -635,38 +998,26 @@ def get_user_dashboard(user_id: int):
         return cached_data
 
     try:
-        bookings_result = supabase.table("user_bookings_simple") \
-            .select("*") \
-            .eq("user_id", user_id) \
-            .execute()
-        
-        bookings = bookings_result.data or []
-        
-        total_bookings = len(bookings)
-        confirmed_bookings = len([b for b in bookings if b["status"] == "confirmed"])
-        
-        total_spent = sum(
-            float(b["total_amount"] or 0) 
-            for b in bookings 
-            if b["status"] in ["confirmed", "completed"]
-        )
-        
+        # Aggregates + rows in one round trip (sql/user_dashboard_rpc.sql);
+        # falls back to fetching the rows and counting in Python
+        stats = _fetch_user_dashboard_stats(user_id=user_id)
+
         result = {
             "user_id": user_id,
             "statistics": {
-                "total_bookings": total_bookings,
-                "confirmed_bookings": confirmed_bookings,
-                "total_spent": total_spent
+                "total_bookings": stats["total_bookings"],
+                "confirmed_bookings": stats["confirmed_bookings"],
+                "total_spent": stats["total_spent"]
             },
-            "bookings": bookings
+            "bookings": stats["bookings"]
         }
-        
+
         CacheManager.set_cache(cache_key, result, CacheManager.USER_DASHBOARD_TTL)
-        
+
         return result
-        
+
     except Exception as e:
-        logging.error(f"Error fetching user dashboard: {e}")
+        logger.error("Error fetching user dashboard: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/user/email/{email}/dashboard")
@@ -687,31 +1038,17 @@ def get_user_dashboard_by_email(email: str):
             user_id = user_result.data[0]["id"]
             return get_user_dashboard(user_id)
         else:
-            bookings_result = supabase.table("user_bookings_simple") \
-                .select("*") \
-                .eq("email", email) \
-                .execute()
-            
-            bookings = bookings_result.data or []
-            
-            total_bookings = len(bookings)
-            confirmed_bookings = len([b for b in bookings if b["status"] == "confirmed"])
-            
-            total_spent = sum(
-                float(b["total_amount"] or 0) 
-                for b in bookings 
-                if b["status"] in ["confirmed", "completed"]
-            )
-            
+            stats = _fetch_user_dashboard_stats(email=email)
+
             result = {
                 "user_email": email,
                 "user_id": None,
                 "statistics": {
-                    "total_bookings": total_bookings,
-                    "confirmed_bookings": confirmed_bookings,
-                    "total_spent": total_spent
+                    "total_bookings": stats["total_bookings"],
+                    "confirmed_bookings": stats["confirmed_bookings"],
+                    "total_spent": stats["total_spent"]
                 },
-                "bookings": bookings
+                "bookings": stats["bookings"]
             }
             
             CacheManager.set_cache(cache_key, result, CacheManager.USER_DASHBOARD_TTL)
@@ -719,14 +1056,67 @@ def get_user_dashboard_by_email(email: str):
             return result
             
     except Exception as e:
-        logging.error(f"Error fetching user dashboard by email: {e}")
+        logger.error("Error fetching user dashboard by email: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _try_cancel_booking_rpc(booking_id: str) -> dict:
+    """Attempt the transactional cancel_booking RPC
+    (sql/cancel_booking_rpc.sql): booking + billing flags and the room
+    status recompute in ONE round trip.
+
+    Returns the result row, raises 404 when the function reports the
+    booking missing, or returns None when the function is not installed
+    so the caller can fall back to the multi-call flow.
+    """
+    try:
+        result = await supabase_async.rpc("cancel_booking", {"p_booking_id": booking_id}).execute()
+    except Exception as rpc_error:
+        if "BOOKING_NOT_FOUND" in str(rpc_error):
+            raise HTTPException(status_code=404, detail="Booking not found")
+        logger.warning("cancel_booking RPC unavailable, using multi-call flow: %s", rpc_error)
+        return None
+
+    data = result.data
+    if isinstance(data, list):
+        data = data[0] if data else None
+    return data
+
+
 @router.put("/bookings/{booking_id}/cancel")
 async def cancel_booking(booking_id: str):
     """Cancel a booking and update room status accordingly"""
     try:
+        # Fast path: one transactional RPC cancels booking + billing and
+        # recomputes the room status
+        rpc_row = await _try_cancel_booking_rpc(booking_id)
+        if rpc_row is not None:
+            room_number = rpc_row["room_number"]
+            new_room_status = rpc_row["new_room_status"]
+
+            guest_name = f"{rpc_row.get('first_name') or ''} {rpc_row.get('last_name') or ''}".strip()
+            if not guest_name:
+                guest_name = rpc_row.get("email") or "Guest"
+
+            asyncio.create_task(
+                trigger_booking_cancelled(
+                    booking_id=booking_id,
+                    guest_name=guest_name
+                )
+            )
+
+            asyncio.create_task(
+                asyncio.to_thread(
+                    lambda: CacheManager.invalidate_booking_related_cache(room_number=room_number)
+                )
+            )
+
+            logger.info("✅ Booking %s cancelled, room %s -> %s (RPC)", booking_id, room_number, new_room_status)
+            return {
+                "success": True,
+                "message": f"Booking {booking_id} cancelled. Room status updated to {new_room_status}."
+            }
+
         booking_result = await asyncio.to_thread(
             lambda: supabase.table("bookings")
             .select("room_number, status, check_in, first_name, last_name, email")
@@ -740,36 +1130,47 @@ async def cancel_booking(booking_id: str):
 
         booking = booking_result.data
         room_number = booking["room_number"]
-        check_in_date = date.fromisoformat(booking["check_in"]) if isinstance(booking["check_in"], str) else booking["check_in"]
+        check_in_date = _as_date(booking["check_in"])
 
-        logging.info(f"📌 Cancelling booking {booking_id} for room {room_number}")
+        logger.info("📌 Cancelling booking %s for room %s", booking_id, room_number)
+
+        # One timestamp for every write in this request
+        now_iso = datetime.now(UTC).isoformat()
 
         # Update booking: set cancelled flags
-        await asyncio.to_thread(
-            lambda: supabase.table("bookings").update({
-                "status": "cancelled",
-                "is_cancelled": True,
-                "updated_at": datetime.utcnow().isoformat()
-            }).eq("booking_id", booking_id).execute()
-        )
+        await asyncio.to_thread(_db_update, "bookings", {
+            "status": "cancelled",
+            "is_cancelled": True,
+            "updated_at": now_iso
+        }, "booking_id", booking_id)
 
-        logging.info(f"✅ Booking {booking_id} marked as cancelled")
+        logger.info("✅ Booking %s marked as cancelled", booking_id)
 
-        # Update billing: mark as cancelled
-        await asyncio.to_thread(
-            lambda: supabase.table("billing").update({
+        # The billing flag and the other-bookings lookup don't depend on
+        # each other - overlap them instead of paying two round trips
+        _, other_future_bookings = await asyncio.gather(
+            asyncio.to_thread(_db_update, "billing", {
                 "is_cancelled": True,
-                "cancelled_at": datetime.utcnow().isoformat()
-            }).eq("booking_id", booking_id).execute()
+                "cancelled_at": now_iso
+            }, "booking_id", booking_id),
+            asyncio.to_thread(
+                lambda: supabase.table("bookings")
+                .select("booking_id, check_in, status")
+                .eq("room_number", room_number)
+                .neq("booking_id", booking_id)
+                .eq("is_cancelled", False)
+                .gte("check_in", check_in_date.isoformat())
+                .execute()
+            )
         )
 
-        logging.info(f"💳 Billing for {booking_id} marked as cancelled")
+        logger.info("💳 Billing for %s marked as cancelled", booking_id)
 
         # Trigger cancellation notification
         guest_name = f"{booking.get('first_name', '')} {booking.get('last_name', '')}".strip()
         if not guest_name:
             guest_name = booking.get('email', 'Guest')
-        
+
         asyncio.create_task(
             trigger_booking_cancelled(
                 booking_id=booking_id,
@@ -777,44 +1178,32 @@ async def cancel_booking(booking_id: str):
             )
         )
 
-        # Check for other active bookings for the same room
-        other_future_bookings = await asyncio.to_thread(
-            lambda: supabase.table("bookings")
-            .select("booking_id, check_in, status")
-            .eq("room_number", room_number)
-            .neq("booking_id", booking_id)
-            .eq("is_cancelled", False)
-            .gte("check_in", check_in_date.isoformat())
-            .execute()
-        )
-
-        logging.info(f"🔍 Found {len(other_future_bookings.data)} future bookings for room {room_number}")
+        logger.info("🔍 Found %s future bookings for room %s", len(other_future_bookings.data), room_number)
 
-        # Determine new room status
-        pkt_today = get_pkt_today()
+        # Determine new room status - no other bookings (the common
+        # case) means the room simply frees up, so skip the recompute
         new_room_status = "Available"
-        
-        for future_booking in other_future_bookings.data:
-            future_check_in = date.fromisoformat(future_booking["check_in"]) if isinstance(future_booking["check_in"], str) else future_booking["check_in"]
-            future_status = future_booking.get("status", "")
-            
-            if future_check_in == pkt_today and future_status in ["confirmed", "pending"]:
-                # Another booking starts today
-                new_room_status = "Occupied" if future_status == "confirmed" else "Booked"
-                break
-            elif future_check_in > pkt_today and future_status in ["confirmed", "pending"]:
-                # Future booking exists
-                new_room_status = "Booked"
-                break
+
+        if other_future_bookings.data:
+            # ISO dates compare lexicographically like dates, so the raw
+            # strings from Supabase are compared as-is - no per-row parse
+            today_iso = get_pkt_today().isoformat()
+            for future_booking in other_future_bookings.data:
+                future_check_in = future_booking["check_in"]
+                future_status = future_booking.get("status", "")
+
+                if future_check_in == today_iso and future_status in ["confirmed", "pending"]:
+                    # Another booking starts today
+                    new_room_status = "Occupied" if future_status == "confirmed" else "Booked"
+                    break
+                elif future_check_in > today_iso and future_status in ["confirmed", "pending"]:
+                    # Future booking exists
+                    new_room_status = "Booked"
+                    break
 
         # Update room status
-        await asyncio.to_thread(
-            lambda: supabase.table("rooms")
-            .update({"status": new_room_status})
-            .eq("room_number", room_number)
-            .execute()
-        )
-        logging.info(f"🏨 Room {room_number} marked as {new_room_status}")
+        await asyncio.to_thread(_db_set_room_status, room_number, new_room_status)
+        logger.info("🏨 Room %s marked as %s", room_number, new_room_status)
 
         # Cache invalidation
         asyncio.create_task(
@@ -822,7 +1211,7 @@ async def cancel_booking(booking_id: str):
                 lambda: CacheManager.invalidate_booking_related_cache(room_number=room_number)
             )
         )
-        logging.info(f"🗑️ Cache invalidated after booking cancellation: {booking_id}")
+        logger.info("🗑️ Cache invalidated after booking cancellation: %s", booking_id)
 
         return {
             "success": True,
@@ -832,7 +1221,7 @@ async def cancel_booking(booking_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"❌ Error cancelling booking: {e}")
+        logger.error("❌ Error cancelling booking: %s", e)
         raise HTTPException(status_code=500, detail=f"Cancellation failed: {str(e)}")
 
 @router.delete("/bookings/{booking_id}/rollback")
@@ -855,7 +1244,7 @@ async def rollback_booking_if_unconfirmed(booking_id: str):
             return {"message": "Billing already confirmed. No rollback."}
 
         room_number = booking["room_number"]
-        check_in_date = date.fromisoformat(booking["check_in"]) if isinstance(booking["check_in"], str) else booking["check_in"]
+        check_in_date = _as_date(booking["check_in"])
 
         # Check for other active bookings for this room
         other_bookings = await asyncio.to_thread(
@@ -867,37 +1256,28 @@ async def rollback_booking_if_unconfirmed(booking_id: str):
             .execute()
         )
 
-        # Determine new room status after rollback
-        pkt_today = get_pkt_today()
+        # Determine new room status after rollback - ISO dates compare
+        # lexicographically like dates, so no per-row parse is needed
+        today_iso = get_pkt_today().isoformat()
         new_room_status = "Available"
-        
+
         for other_booking in other_bookings.data:
-            other_check_in = date.fromisoformat(other_booking["check_in"]) if isinstance(other_booking["check_in"], str) else other_booking["check_in"]
+            other_check_in = other_booking["check_in"]
             other_status = other_booking.get("status", "")
-            
-            if other_check_in == pkt_today and other_status in ["confirmed", "pending"]:
+
+            if other_check_in == today_iso and other_status in ["confirmed", "pending"]:
                 new_room_status = "Occupied" if other_status == "confirmed" else "Booked"
                 break
-            elif other_check_in > pkt_today and other_status in ["confirmed", "pending"]:
+            elif other_check_in > today_iso and other_status in ["confirmed", "pending"]:
                 new_room_status = "Booked"
                 break
 
         # Update room status
-        await asyncio.to_thread(
-            lambda: supabase.table("rooms")
-            .update({"status": new_room_status})
-            .eq("room_number", room_number)
-            .execute()
-        )
-        logging.info(f"🏨 Room {room_number} marked as {new_room_status} after rollback")
+        await asyncio.to_thread(_db_set_room_status, room_number, new_room_status)
+        logger.info("🏨 Room %s marked as %s after rollback", room_number, new_room_status)
 
         # Delete booking
-        await asyncio.to_thread(
-            lambda: supabase.table("bookings")
-            .delete()
-            .eq("booking_id", booking_id)
-            .execute()
-        )
+        await asyncio.to_thread(_db_delete, "bookings", "booking_id", booking_id)
 
         # Cache invalidation
         asyncio.create_task(
@@ -911,7 +1291,7 @@ async def rollback_booking_if_unconfirmed(booking_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"❌ Rollback failed: {e}")
+        logger.error("❌ Rollback failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============================================
@@ -921,8 +1301,4 @@ async def rollback_booking_if_unconfirmed(booking_id: str):
 @router.get("/check-in-time-options")
 def get_check_in_time_options():
     """Get available check-in time options"""
-    return {
-        "options": CHECK_IN_TIME_OPTIONS,
-        "default": DEFAULT_CHECK_IN_TIME.strftime("%H:%M"),
-        "check_out_time": DEFAULT_CHECK_OUT_TIME.strftime("%H:%M")
-    }
\ No newline at end of file
+    return CHECK_IN_TIME_RESPONSE
\ No newline at end of file
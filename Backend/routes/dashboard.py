@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from supabase_client import supabase
 from datetime import datetime, timezone, date, timedelta
+import orjson
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+UTC = timezone.utc
+
 
 @router.get("/summary")
 def get_dashboard_summary():
@@ -44,10 +48,14 @@ def get_dashboard_summary():
 
 
 @router.get("/bookings")
-def get_all_bookings(limit: int = Query(8), offset: int = Query(0)):
+def get_all_bookings(
+    limit: int = Query(8),
+    offset: int = Query(0),
+    stream: bool = Query(False, description="Stream rows as NDJSON instead of one JSON array")
+):
     """Get recent/future bookings (with billing), exclude cancelled ones"""
     try:
-        today = datetime.utcnow().date()
+        today = datetime.now(UTC).date()
         fifteen_days_ago = today - timedelta(days=15)
 
         # 🔧 Fixed: Fetch bookings with billing and ensure proper ordering
@@ -78,6 +86,15 @@ def get_all_bookings(limit: int = Query(8), offset: int = Query(0)):
             }
             formatted_bookings.append(formatted_booking)
 
+        if stream:
+            # NDJSON: one booking per line, encoded as it is yielded so the
+            # client gets first bytes before the whole list is serialized
+            def booking_lines():
+                for booking in formatted_bookings:
+                    yield orjson.dumps(booking) + b"\n"
+
+            return StreamingResponse(booking_lines(), media_type="application/x-ndjson")
+
         return {"bookings": formatted_bookings}
 
     except Exception as e:
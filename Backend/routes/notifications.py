@@ -7,10 +7,12 @@ from pydantic import BaseModel
 import asyncio
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+
+UTC = timezone.utc
 manager = ConnectionManager()
 
 # Pydantic model for notification settings
@@ -44,7 +46,7 @@ async def call_edge_function_for_cleanup(booking_id: Optional[str] = None, delay
         logger.info(f"🧹 Starting cleanup process for booking: {booking_id or 'all unpaid'}")
         
         # Calculate cutoff time (bookings older than this are eligible for cleanup)
-        cutoff_time = datetime.utcnow() - timedelta(minutes=delay_minutes)
+        cutoff_time = datetime.now(UTC) - timedelta(minutes=delay_minutes)
         
         # Query for unpaid/pending bookings that are past the cutoff
         query = supabase.table("bookings").select("booking_id, room_number, first_name, last_name, status, created_at")
@@ -82,14 +84,14 @@ async def call_edge_function_for_cleanup(booking_id: Optional[str] = None, delay
                 supabase.table("bookings").update({
                     "status": "cancelled",
                     "is_cancelled": True,
-                    "updated_at": datetime.utcnow().isoformat()
+                    "updated_at": datetime.now(UTC).isoformat()
                 }).eq("booking_id", booking_id_to_cancel).execute()
                 
                 # Cancel billing if exists
                 if billing_check.data:
                     supabase.table("billing").update({
                         "is_cancelled": True,
-                        "cancelled_at": datetime.utcnow().isoformat()
+                        "cancelled_at": datetime.now(UTC).isoformat()
                     }).eq("booking_id", booking_id_to_cancel).execute()
                 
                 # Reset room status to Available
@@ -97,7 +99,6 @@ async def call_edge_function_for_cleanup(booking_id: Optional[str] = None, delay
                 other_bookings = supabase.table("bookings").select("booking_id, check_in, status").eq("room_number", room_number).neq("booking_id", booking_id_to_cancel).eq("is_cancelled", False).execute()
                 
                 new_room_status = "Available"
-                from datetime import date
                 today = date.today()
                 
                 for other_booking in other_bookings.data:
@@ -176,10 +177,8 @@ async def get_notifications(
     time_filter: str = Query("new", description="Filter: 'new' (7 days), 'older' (30 days)")
 ):
     try:
-        from datetime import datetime, timedelta
-        
         # Calculate date threshold based on filter
-        now = datetime.utcnow()
+        now = datetime.now(UTC)
         if time_filter == "new":
             date_threshold = now - timedelta(days=7)
         else:  # older
@@ -2,11 +2,22 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException
 from typing import List
 from models.rtype import RoomType, RoomTypeCreate, RoomTypeUpdate, RoomTypeResponse
-from supabase_client import supabase
+from supabase_client import supabase, TRUSTED_DB
+from utils.cache_helper import CacheManager
 import logging
 
 router = APIRouter()
 
+def build_room_type_response(room_type: dict, total_capacity: int) -> RoomTypeResponse:
+    """Convert a room_types row into a RoomTypeResponse.
+
+    DB rows were validated on write, so when TRUSTED_DB is set we use
+    model_construct and skip re-running validators on every read.
+    """
+    if TRUSTED_DB:
+        return RoomTypeResponse.model_construct(**room_type, total_capacity=total_capacity)
+    return RoomTypeResponse(**room_type, total_capacity=total_capacity)
+
 @router.get("/room-types", response_model=List[RoomTypeResponse])
 def get_room_types():
     """Get all room types with calculated total capacity"""
@@ -15,12 +26,12 @@ def get_room_types():
         room_types = []
         
         for room_type in result.data:
-            room_type_response = RoomTypeResponse(
-                **room_type,
+            room_type_response = build_room_type_response(
+                room_type,
                 total_capacity=room_type["max_adults"] + room_type["max_children"]
             )
             room_types.append(room_type_response)
-        
+
         return room_types
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -33,8 +44,8 @@ def get_room_types_for_admin():
         room_types = []
         
         for room_type in result.data:
-            room_type_response = RoomTypeResponse(
-                **room_type,
+            room_type_response = build_room_type_response(
+                room_type,
                 total_capacity=(room_type.get("max_adults") or 2) + (room_type.get("max_children") or 1)
             )
             room_types.append(room_type_response)
@@ -52,12 +63,12 @@ def get_available_room_types_for_featured_rooms():
         room_types = []
         
         for room_type in result.data:
-            room_type_response = RoomTypeResponse(
-                **room_type,
+            room_type_response = build_room_type_response(
+                room_type,
                 total_capacity=room_type["max_adults"] + room_type["max_children"]
             )
             room_types.append(room_type_response)
-        
+
         return {"room_types": room_types}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -129,6 +140,8 @@ def create_room_type(room_type: RoomTypeCreate):
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create room type")
         
+        CacheManager.invalidate_room_types_cache()
+
         created_room_type = result.data[0]
         return RoomTypeResponse(
             **created_room_type,
@@ -189,6 +202,8 @@ def update_room_type(room_type_id: int, room_type_update: RoomTypeUpdate):
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to update room type")
         
+        CacheManager.invalidate_room_types_cache()
+
         updated_room_type = result.data[0]
         return RoomTypeResponse(
             **updated_room_type,
@@ -218,7 +233,9 @@ def delete_room_type(room_type_id: int):
         
         # Delete room type
         supabase.table("room_types").delete().eq("id", room_type_id).execute()
-        
+
+        CacheManager.invalidate_room_types_cache()
+
         return {"message": "Room type deleted successfully"}
     except HTTPException:
         raise
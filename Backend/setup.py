@@ -0,0 +1,31 @@
+# setup.py - Optional mypyc compilation for the Pydantic models package
+#
+# The models in models/*.py sit on the hottest request paths (every booking
+# and billing request validates through them). Compiling them to C extensions
+# moves validator dispatch and __init__ into native code.
+#
+# Usage (requires `pip install mypy`):
+#   cd Backend && python setup.py build_ext --inplace
+#
+# The resulting .so files load transparently instead of the .py sources.
+# Skipping this step is fine - the app runs unchanged from pure Python.
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+except ImportError:  # mypy not installed - plain Python deployment
+    ext_modules = []
+else:
+    ext_modules = mypycify([
+        "models/billing.py",
+        "models/booking.py",
+        "models/room.py",
+        "models/rtype.py",
+        "models/billing_settings.py",
+    ])
+
+setup(
+    name="hotel-backend-models",
+    version="2.0.0",
+    ext_modules=ext_modules,
+)
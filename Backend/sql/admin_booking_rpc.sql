@@ -0,0 +1,140 @@
+-- Transactional admin booking: room-type lookup, locked room selection,
+-- booking + billing inserts and the room-status flip in ONE round trip
+-- and one transaction. Replaces 4+ sequential PostgREST calls plus the
+-- Python rollback path - on any error the whole transaction rolls back.
+--
+-- Room selection takes the candidate row FOR UPDATE (SKIP LOCKED when
+-- auto-picking), so two concurrent requests can never both grab the
+-- same room: the second caller gets the next room or NO_ROOM_AVAILABLE.
+-- Depends on the bookings.stay daterange column (availability_rpc.sql).
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION create_admin_booking(payload jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_room_type   room_types;
+    v_vat         numeric := 13.0;
+    v_discount    numeric := 0.0;
+    v_room        rooms;
+    v_today       date := (now() AT TIME ZONE 'Asia/Karachi')::date;
+    v_check_in    date := (payload->>'check_in')::date;
+    v_check_out   date := (payload->>'check_out')::date;
+    v_status      text := COALESCE(payload->>'status', 'confirmed');
+    v_nights      int;
+    v_base        numeric;
+    v_total       numeric;
+    v_req_total   numeric := COALESCE((payload->>'total_amount')::numeric, 0);
+    v_billing_id  bigint;
+BEGIN
+    SELECT * INTO v_room_type
+    FROM room_types
+    WHERE id = (payload->>'room_type_id')::int;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'ROOM_TYPE_NOT_FOUND';
+    END IF;
+
+    SELECT vat, discount INTO v_vat, v_discount
+    FROM billing_settings
+    ORDER BY id DESC
+    LIMIT 1;
+
+    -- Candidate room, locked for the rest of the transaction. When the
+    -- admin named a room we wait on its lock (FOR UPDATE); when auto-
+    -- picking, SKIP LOCKED hands concurrent callers different rooms.
+    IF COALESCE(payload->>'room_number', '') <> '' THEN
+        SELECT r.* INTO v_room
+        FROM rooms r
+        WHERE r.room_number = payload->>'room_number'
+          AND r.room_type_id = v_room_type.id
+          AND r.status <> 'Maintenance'
+          AND NOT EXISTS (
+              SELECT 1 FROM bookings b
+              WHERE b.room_number = r.room_number
+                AND b.is_cancelled = false
+                AND b.stay && daterange(v_check_in, v_check_out, '[)')
+          )
+        FOR UPDATE;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'ROOM_NOT_AVAILABLE';
+        END IF;
+    ELSE
+        SELECT r.* INTO v_room
+        FROM rooms r
+        WHERE r.room_type_id = v_room_type.id
+          AND r.status <> 'Maintenance'
+          AND NOT EXISTS (
+              SELECT 1 FROM bookings b
+              WHERE b.room_number = r.room_number
+                AND b.is_cancelled = false
+                AND b.stay && daterange(v_check_in, v_check_out, '[)')
+          )
+        ORDER BY r.room_number
+        FOR UPDATE SKIP LOCKED
+        LIMIT 1;
+
+        IF NOT FOUND THEN
+            RAISE EXCEPTION 'NO_ROOM_AVAILABLE';
+        END IF;
+    END IF;
+
+    v_nights := GREATEST(v_check_out - v_check_in, 1);
+    v_base := v_room_type.base_price * v_nights;
+    v_total := CASE
+        WHEN v_req_total > 0 THEN v_req_total
+        ELSE v_base * (1 - v_discount / 100) * (1 + v_vat / 100)
+    END;
+
+    INSERT INTO bookings (
+        booking_id, check_in, check_out, check_in_time, check_out_time,
+        guests, room_number, room_type, first_name, last_name, email,
+        phone, status, source, user_id, special_requests,
+        is_updated, is_cancelled, created_at
+    ) VALUES (
+        payload->>'booking_id', v_check_in, v_check_out,
+        COALESCE(payload->>'check_in_time', '12:00'),
+        COALESCE(payload->>'check_out_time', '12:00'),
+        COALESCE((payload->>'guests')::int, 2),
+        v_room.room_number, v_room.room_type,
+        payload->>'first_name', payload->>'last_name',
+        payload->>'email',
+        COALESCE((payload->>'phone')::bigint, 0),
+        v_status, 'Admin',
+        (payload->>'user_id')::int,
+        COALESCE(payload->>'special_requests', ''),
+        false, false,
+        COALESCE((payload->>'created_at')::timestamptz, now())
+    );
+
+    INSERT INTO billing (
+        booking_id, room_price, discount, vat, total_amount,
+        payment_method, payment_status, is_cancelled, created_at
+    ) VALUES (
+        payload->>'booking_id', v_room_type.base_price, v_discount, v_vat,
+        v_total,
+        COALESCE(payload->>'payment_method', 'Admin'),
+        COALESCE(payload->>'payment_status', 'Pending'),
+        false,
+        COALESCE((payload->>'created_at')::timestamptz, now())
+    )
+    RETURNING id INTO v_billing_id;
+
+    UPDATE rooms
+    SET status = CASE
+        WHEN v_check_in = v_today AND v_status = 'confirmed' THEN 'Occupied'
+        WHEN v_check_in > v_today THEN 'Booked'
+        ELSE status
+    END
+    WHERE room_number = v_room.room_number;
+
+    RETURN jsonb_build_object(
+        'booking_id', payload->>'booking_id',
+        'room_number', v_room.room_number,
+        'billing_id', v_billing_id,
+        'total_amount', v_total
+    );
+END;
+$$;
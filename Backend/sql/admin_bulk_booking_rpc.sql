@@ -0,0 +1,24 @@
+-- Bulk admin bookings in one transactional round trip: reuses
+-- create_admin_booking (sql/admin_booking_rpc.sql) per element, so room
+-- selection still locks rows with FOR UPDATE / SKIP LOCKED, but a
+-- 100-booking import costs one HTTP call instead of hundreds. Any
+-- failed row (no room, bad room type) aborts and rolls back the whole
+-- batch - all or nothing.
+-- Requires create_admin_booking. Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION create_admin_bookings_bulk(payload jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    item    jsonb;
+    results jsonb := '[]'::jsonb;
+BEGIN
+    FOR item IN SELECT * FROM jsonb_array_elements(payload)
+    LOOP
+        results := results || create_admin_booking(item);
+    END LOOP;
+
+    RETURN results;
+END;
+$$;
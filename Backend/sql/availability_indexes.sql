@@ -0,0 +1,24 @@
+-- Covering indexes for the hot availability queries in
+-- routes/availability_routes.py. Run each statement separately in the
+-- Supabase SQL editor (CREATE INDEX CONCURRENTLY cannot run inside a
+-- transaction block).
+
+-- Backs the bookings fetch in _get_available_rooms_fallback:
+--   WHERE room_number IN (...) AND is_cancelled = false
+--   AND check_out >= :check_in AND check_in <= :check_out
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_bookings_availability
+    ON bookings (room_number, check_in, check_out)
+    INCLUDE (status)
+    WHERE is_cancelled = false;
+
+-- Backs the rooms-by-type fetches; INCLUDE makes them index-only scans
+-- so the heap is never touched.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_rooms_type_status
+    ON rooms (room_type_id)
+    INCLUDE (room_number, status, room_type)
+    WHERE status <> 'Maintenance';
+
+-- Verify with:
+--   EXPLAIN (ANALYZE, BUFFERS) SELECT ... ;
+-- the bookings query should switch from a bitmap heap scan to an
+-- index(-only) scan with far fewer shared-hit buffers.
@@ -0,0 +1,63 @@
+-- Availability via range overlap in Postgres instead of Python-side scans.
+-- Run once in the Supabase SQL editor (requires btree_gist for the composite
+-- index on room_number + stay).
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Stay as a half-open date range [check_in, check_out); generated so it can
+-- never drift from the source columns.
+ALTER TABLE bookings
+    ADD COLUMN IF NOT EXISTS stay daterange
+    GENERATED ALWAYS AS (daterange(check_in::date, check_out::date, '[)')) STORED;
+
+-- Overlap lookups become an O(log n) index probe per room.
+CREATE INDEX IF NOT EXISTS bookings_stay_gist
+    ON bookings USING gist (room_number, stay)
+    WHERE is_cancelled = false;
+
+-- Rooms of a type that are free for [p_check_in, p_check_out) and not under
+-- maintenance. Mirrors get_available_rooms_optimized in
+-- routes/availability_routes.py, which falls back to a Python scan when this
+-- function is not installed yet.
+-- Per-room-type status breakdown in one aggregate scan; backs
+-- get_room_types_with_availability in routes/availability_routes.py.
+CREATE OR REPLACE FUNCTION room_status_counts()
+RETURNS TABLE (
+    room_type_id integer,
+    status text,
+    c bigint
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT r.room_type_id, r.status, count(*)
+    FROM rooms r
+    GROUP BY 1, 2;
+$$;
+
+CREATE OR REPLACE FUNCTION available_rooms(
+    p_room_type_id integer,
+    p_check_in date,
+    p_check_out date
+)
+RETURNS TABLE (
+    room_number text,
+    room_type text,
+    room_type_id integer,
+    status text
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT r.room_number, r.room_type, r.room_type_id, r.status
+    FROM rooms r
+    WHERE r.room_type_id = p_room_type_id
+      AND r.status <> 'Maintenance'
+      AND NOT EXISTS (
+          SELECT 1
+          FROM bookings b
+          WHERE b.room_number = r.room_number
+            AND b.is_cancelled = false
+            AND b.stay && daterange(p_check_in, p_check_out, '[)')
+      );
+$$;
@@ -0,0 +1,31 @@
+-- One-read prep for billing creation: the booking row joined with its
+-- room type's base_price and the current billing settings, so the Python
+-- fallback path no longer issues separate bookings / room_types /
+-- billing_settings queries.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE VIEW v_billing_prep AS
+SELECT b.booking_id,
+       b.status,
+       b.is_cancelled,
+       b.room_type,
+       b.check_in,
+       b.check_out,
+       b.room_number,
+       b.nights,
+       b.first_name,
+       b.last_name,
+       b.user_id,
+       rt.base_price,
+       bs.vat,
+       bs.discount
+FROM bookings b
+-- LEFT JOINs keep the booking visible even if the room type was renamed
+-- or settings are empty; Python keeps its own not-found handling
+LEFT JOIN room_types rt ON rt.name = b.room_type
+LEFT JOIN LATERAL (
+    SELECT vat, discount
+    FROM billing_settings
+    ORDER BY id DESC
+    LIMIT 1
+) bs ON true;
@@ -0,0 +1,93 @@
+-- Transactional billing creation + booking confirmation, replacing the
+-- multi-step orchestration in routes/billing.py (which stays as the
+-- fallback when this function is not installed). One round-trip, and the
+-- compensating "delete billing if the confirm failed" logic disappears:
+-- the transaction rolls everything back on error. FOR UPDATE on the
+-- booking row also closes the race where two concurrent payment
+-- completions both pass the duplicate-billing check.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION create_billing_and_confirm(
+    p_booking_id text,
+    p_payment_method text,
+    p_payment_status text
+)
+RETURNS billing
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_booking bookings%ROWTYPE;
+    v_base_price numeric;
+    v_vat numeric;
+    v_discount numeric;
+    v_nights integer;
+    v_base_amount numeric;
+    v_discount_amount numeric;
+    v_billing billing;
+    v_today date := (now() AT TIME ZONE 'Asia/Karachi')::date;
+BEGIN
+    SELECT * INTO v_booking
+    FROM bookings
+    WHERE booking_id = p_booking_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'BOOKING_NOT_FOUND';
+    END IF;
+    IF v_booking.is_cancelled THEN
+        RAISE EXCEPTION 'BOOKING_CANCELLED';
+    END IF;
+    IF v_booking.status <> 'pending' THEN
+        RAISE EXCEPTION 'BOOKING_NOT_PENDING: %', v_booking.status;
+    END IF;
+    IF EXISTS (SELECT 1 FROM billing WHERE booking_id = p_booking_id) THEN
+        RAISE EXCEPTION 'BILLING_EXISTS';
+    END IF;
+
+    SELECT base_price INTO v_base_price
+    FROM room_types
+    WHERE name = v_booking.room_type;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'ROOM_TYPE_NOT_FOUND';
+    END IF;
+
+    SELECT vat, discount INTO v_vat, v_discount
+    FROM billing_settings
+    ORDER BY id DESC
+    LIMIT 1;
+
+    IF NOT FOUND THEN
+        v_vat := 13.0;
+        v_discount := 0.0;
+    END IF;
+
+    -- Same math as the Python path
+    v_nights := GREATEST(v_booking.check_out::date - v_booking.check_in::date, 1);
+    v_base_amount := v_base_price * v_nights;
+    v_discount_amount := v_base_amount * (v_discount / 100);
+
+    INSERT INTO billing (
+        booking_id, room_price, discount, vat, total_amount,
+        payment_method, payment_status, is_cancelled, created_at
+    )
+    VALUES (
+        p_booking_id, v_base_price, v_discount, v_vat,
+        (v_base_amount - v_discount_amount) * (1 + v_vat / 100),
+        p_payment_method, p_payment_status, false, now()
+    )
+    RETURNING * INTO v_billing;
+
+    UPDATE bookings
+    SET status = 'confirmed', updated_at = now()
+    WHERE booking_id = p_booking_id;
+
+    -- Today's check-in goes straight to Occupied; future stays remain Booked
+    IF v_booking.check_in::date = v_today THEN
+        UPDATE rooms SET status = 'Occupied'
+        WHERE room_number = v_booking.room_number;
+    END IF;
+
+    RETURN v_billing;
+END;
+$$;
@@ -0,0 +1,24 @@
+-- Collapse billing_settings to a fixed singleton row (id = 1) so the PUT
+-- handler can upsert in one round-trip instead of SELECT-then-UPDATE/INSERT.
+-- Readers keep using "latest by id desc", which resolves to the singleton
+-- once the history rows are gone.
+-- Run once in the Supabase SQL editor.
+
+INSERT INTO billing_settings (id, vat, discount, updated_at)
+VALUES (1, 13.0, 0.0, now())
+ON CONFLICT (id) DO NOTHING;
+
+-- Keep the newest values on the singleton before dropping older rows
+UPDATE billing_settings s
+SET vat = latest.vat,
+    discount = latest.discount,
+    updated_at = latest.updated_at
+FROM (
+    SELECT vat, discount, updated_at
+    FROM billing_settings
+    ORDER BY id DESC
+    LIMIT 1
+) latest
+WHERE s.id = 1;
+
+DELETE FROM billing_settings WHERE id <> 1;
@@ -0,0 +1,11 @@
+-- Enforce one billing row per booking in the database. The app-side
+-- "SELECT id FROM billing WHERE booking_id = ?" pre-check was a TOCTOU
+-- race - two concurrent payment completions could both pass it and both
+-- insert. With this index the insert itself is the check: the loser gets
+-- unique_violation (23505), which routes/billing.py already maps to the
+-- "Billing already exists" 400.
+-- Run in the Supabase SQL editor outside a transaction block.
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS billing_booking_id_key
+    ON billing (booking_id)
+    WHERE is_cancelled = false;
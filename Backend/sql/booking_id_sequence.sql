@@ -0,0 +1,47 @@
+-- Race-free booking ids from a sequence. The Python generator reads the
+-- newest row and increments the suffix, so two concurrent bookings can
+-- read the same last id and collide; nextval() is atomic and never
+-- repeats. next_booking_id() backs generate_next_booking_id in
+-- routes/bookings.py, which falls back to the order-by scan until this
+-- is installed.
+-- Run once in the Supabase SQL editor.
+
+CREATE SEQUENCE IF NOT EXISTS booking_seq;
+
+-- Start above every id already issued (BK%03d suffix -> integer). The
+-- three-argument form leaves the sequence un-called when bookings is
+-- empty - setval(seq, 0) would raise out-of-bounds and abort the whole
+-- script - so a fresh install issues BK001 first, max+1 otherwise.
+SELECT setval('booking_seq', COALESCE(s.max_id, 1), s.max_id IS NOT NULL)
+FROM (SELECT MAX(substring(booking_id FROM 3)::int) AS max_id FROM bookings) s;
+
+-- Pad to three digits without truncating wider values: lpad would cut
+-- '1000' down to '100', colliding with an earlier id. This matches
+-- Python's zfill(3), which only ever pads.
+CREATE OR REPLACE FUNCTION format_booking_id(p_n bigint)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT 'BK' || CASE WHEN length(p_n::text) < 3
+                        THEN lpad(p_n::text, 3, '0')
+                        ELSE p_n::text
+                   END;
+$$;
+
+CREATE OR REPLACE FUNCTION next_booking_id()
+RETURNS text
+LANGUAGE sql
+AS $$
+    SELECT format_booking_id(nextval('booking_seq'));
+$$;
+
+-- Block reservation for the bulk endpoint: one call returns p_count
+-- consecutive ids that no concurrent caller can reuse.
+CREATE OR REPLACE FUNCTION next_booking_ids(p_count int)
+RETURNS text[]
+LANGUAGE sql
+AS $$
+    SELECT array_agg(format_booking_id(n.n) ORDER BY n.n)
+    FROM (SELECT nextval('booking_seq') AS n FROM generate_series(1, p_count)) n;
+$$;
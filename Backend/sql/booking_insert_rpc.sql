@@ -0,0 +1,44 @@
+-- Insert a booking and apply the matching room-status transition in one
+-- transaction. The PKT date branch previously lived in Python
+-- (update_room_status_based_on_date) and cost a second round trip after
+-- every booking insert; Postgres evaluates the same CASE in-place.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION insert_booking_with_room_status(p_booking jsonb)
+RETURNS bookings
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_booking bookings;
+    v_today   date := (now() AT TIME ZONE 'Asia/Karachi')::date;
+BEGIN
+    -- Explicit column list so serial/default columns (id) stay untouched
+    INSERT INTO bookings (
+        booking_id, check_in, check_out, check_in_time, check_out_time,
+        guests, room_number, room_type, first_name, last_name, email,
+        phone, status, source, user_id, special_requests,
+        is_updated, is_cancelled, created_at
+    )
+    SELECT r.booking_id, r.check_in, r.check_out, r.check_in_time, r.check_out_time,
+           r.guests, r.room_number, r.room_type, r.first_name, r.last_name, r.email,
+           r.phone, r.status, r.source, r.user_id, r.special_requests,
+           r.is_updated, r.is_cancelled, r.created_at
+    FROM jsonb_populate_record(NULL::bookings, p_booking) r
+    RETURNING * INTO v_booking;
+
+    -- Same branch as update_room_status_based_on_date:
+    --   check-in today + confirmed -> Occupied
+    --   check-in in the future     -> Booked
+    --   otherwise                  -> leave as-is
+    UPDATE rooms
+    SET status = CASE
+        WHEN v_booking.check_in::date = v_today
+             AND v_booking.status = 'confirmed' THEN 'Occupied'
+        WHEN v_booking.check_in::date > v_today THEN 'Booked'
+        ELSE status
+    END
+    WHERE room_number = v_booking.room_number;
+
+    RETURN v_booking;
+END;
+$$;
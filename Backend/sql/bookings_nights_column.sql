@@ -0,0 +1,9 @@
+-- Stored generated column so the stay length is computed once by
+-- Postgres instead of parsed and subtracted in Python on every billing
+-- create. Assumes check_in/check_out are date columns (they are cast to
+-- ::date elsewhere in these scripts).
+-- Run once in the Supabase SQL editor.
+
+ALTER TABLE bookings
+    ADD COLUMN IF NOT EXISTS nights int
+    GENERATED ALWAYS AS (GREATEST(check_out - check_in, 1)) STORED;
@@ -0,0 +1,12 @@
+-- Partial covering index for the "other bookings on this room" lookup
+-- that runs on every cancellation/rollback (room_number + check_in
+-- filter, is_cancelled = false). INCLUDE carries the selected columns so
+-- the query is answered from the index without touching heap pages; it
+-- also serves the availability overlap scans. CONCURRENTLY avoids
+-- locking the table, but cannot run inside a transaction - execute this
+-- statement on its own in the Supabase SQL editor.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS bookings_room_future_idx
+    ON bookings (room_number, check_in)
+    INCLUDE (booking_id, status)
+    WHERE is_cancelled = false;
@@ -0,0 +1,69 @@
+-- Whole cancellation in one transaction: flag the booking and its
+-- billing row, recompute the room's status from the remaining bookings
+-- and apply it - replacing five sequential PostgREST round trips.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION cancel_booking(p_booking_id text)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_booking    bookings;
+    v_today      date := (now() AT TIME ZONE 'Asia/Karachi')::date;
+    v_new_status text;
+BEGIN
+    SELECT * INTO v_booking
+    FROM bookings
+    WHERE booking_id = p_booking_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'BOOKING_NOT_FOUND';
+    END IF;
+
+    UPDATE bookings
+    SET status = 'cancelled',
+        is_cancelled = true,
+        updated_at = now()
+    WHERE booking_id = p_booking_id;
+
+    UPDATE billing
+    SET is_cancelled = true,
+        cancelled_at = now()
+    WHERE booking_id = p_booking_id;
+
+    -- Same branch order as the Python recompute: a confirmed booking
+    -- starting today keeps the room Occupied, any other active current/
+    -- future booking keeps it Booked, otherwise it frees up
+    SELECT CASE
+        WHEN EXISTS (
+            SELECT 1 FROM bookings b
+            WHERE b.room_number = v_booking.room_number
+              AND b.booking_id <> p_booking_id
+              AND b.is_cancelled = false
+              AND b.status = 'confirmed'
+              AND b.check_in::date = v_today
+        ) THEN 'Occupied'
+        WHEN EXISTS (
+            SELECT 1 FROM bookings b
+            WHERE b.room_number = v_booking.room_number
+              AND b.booking_id <> p_booking_id
+              AND b.is_cancelled = false
+              AND b.status IN ('confirmed', 'pending')
+              AND b.check_in::date >= v_today
+        ) THEN 'Booked'
+        ELSE 'Available'
+    END INTO v_new_status;
+
+    UPDATE rooms
+    SET status = v_new_status
+    WHERE room_number = v_booking.room_number;
+
+    RETURN jsonb_build_object(
+        'room_number', v_booking.room_number,
+        'new_room_status', v_new_status,
+        'first_name', v_booking.first_name,
+        'last_name', v_booking.last_name,
+        'email', v_booking.email
+    );
+END;
+$$;
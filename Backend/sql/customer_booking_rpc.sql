@@ -0,0 +1,97 @@
+-- Transactional customer booking: room-type lookup, locked room
+-- selection, total validation and the booking insert + room-status flip
+-- in ONE round trip and one transaction. Replaces the sequential
+-- room-type fetch, availability scan, insert and room update - on any
+-- error the whole transaction rolls back, so the Python rollback path
+-- is never needed on this path.
+--
+-- SKIP LOCKED hands concurrent callers different rooms, so two pending
+-- bookings can never land on the same room for overlapping dates.
+-- Depends on the bookings.stay daterange column (availability_rpc.sql).
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION create_customer_booking(payload jsonb)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_room_type  room_types;
+    v_room       rooms;
+    v_today      date := (now() AT TIME ZONE 'Asia/Karachi')::date;
+    v_check_in   date := (payload->>'check_in')::date;
+    v_check_out  date := (payload->>'check_out')::date;
+    v_nights     int;
+    v_calculated numeric;
+    v_req_total  numeric := COALESCE((payload->>'total_amount')::numeric, 0);
+    v_total      numeric;
+BEGIN
+    SELECT * INTO v_room_type
+    FROM room_types
+    WHERE id = (payload->>'room_type_id')::int;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'ROOM_TYPE_NOT_FOUND';
+    END IF;
+
+    SELECT r.* INTO v_room
+    FROM rooms r
+    WHERE r.room_type_id = v_room_type.id
+      AND r.status <> 'Maintenance'
+      AND NOT EXISTS (
+          SELECT 1 FROM bookings b
+          WHERE b.room_number = r.room_number
+            AND b.is_cancelled = false
+            AND b.stay && daterange(v_check_in, v_check_out, '[)')
+      )
+    ORDER BY r.room_number
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'NO_ROOM_AVAILABLE';
+    END IF;
+
+    -- Same 10% sanity clamp as the Python path: accept the client's
+    -- total only when it is close to nights * base_price
+    v_nights := GREATEST(v_check_out - v_check_in, 1);
+    v_calculated := v_room_type.base_price * v_nights;
+    v_total := CASE
+        WHEN abs(v_req_total - v_calculated) <= v_calculated * 0.1 THEN v_req_total
+        ELSE v_calculated
+    END;
+
+    INSERT INTO bookings (
+        booking_id, check_in, check_out, check_in_time, check_out_time,
+        guests, room_number, room_type, first_name, last_name, email,
+        phone, status, source, user_id, special_requests,
+        is_updated, is_cancelled, created_at
+    ) VALUES (
+        payload->>'booking_id', v_check_in, v_check_out,
+        COALESCE(payload->>'check_in_time', '12:00'),
+        COALESCE(payload->>'check_out_time', '12:00'),
+        COALESCE((payload->>'guests')::int, 2),
+        v_room.room_number, v_room.room_type,
+        payload->>'first_name', payload->>'last_name',
+        payload->>'email',
+        COALESCE((payload->>'phone')::bigint, 0),
+        'pending', 'Direct',
+        (payload->>'user_id')::int,
+        COALESCE(payload->>'special_requests', ''),
+        false, false,
+        COALESCE((payload->>'created_at')::timestamptz, now())
+    );
+
+    -- Customer rule: today's booking keeps the room Available until
+    -- payment confirms; only future stays flip it to Booked
+    UPDATE rooms
+    SET status = 'Booked'
+    WHERE room_number = v_room.room_number
+      AND v_check_in > v_today;
+
+    RETURN jsonb_build_object(
+        'booking_id', payload->>'booking_id',
+        'room_number', v_room.room_number,
+        'total_amount', v_total
+    );
+END;
+$$;
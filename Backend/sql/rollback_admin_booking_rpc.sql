@@ -0,0 +1,21 @@
+-- Admin-booking failure cleanup in one round trip: drop the billing row
+-- and the half-created booking, then free the room - replacing the three
+-- sequential calls the API's except block used to issue. Only the Python
+-- fallback path needs this; the create_admin_booking RPC
+-- (sql/admin_booking_rpc.sql) is a single transaction and rolls itself
+-- back on failure.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION rollback_admin_booking(p_booking_id text, p_room_number text)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM billing WHERE booking_id = p_booking_id;
+    DELETE FROM bookings WHERE booking_id = p_booking_id;
+
+    IF p_room_number IS NOT NULL AND p_room_number <> '' THEN
+        UPDATE rooms SET status = 'Available' WHERE room_number = p_room_number;
+    END IF;
+END;
+$$;
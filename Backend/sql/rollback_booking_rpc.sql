@@ -0,0 +1,18 @@
+-- Failure-path cleanup in one round trip: delete the half-created
+-- booking and free its room atomically. The API's except block used to
+-- issue these as two sequential calls, exactly when the DB is already
+-- under stress.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION rollback_booking(p_booking_id text, p_room_number text)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM bookings WHERE booking_id = p_booking_id;
+
+    IF p_room_number IS NOT NULL THEN
+        UPDATE rooms SET status = 'Available' WHERE room_number = p_room_number;
+    END IF;
+END;
+$$;
@@ -0,0 +1,37 @@
+-- Keep the denormalized rooms.status column correct as stays begin and end.
+-- The API trusts "Occupied" for today-occupancy checks (see
+-- _get_available_rooms_fallback in routes/availability_routes.py),
+-- so this must run nightly.
+-- Run once in the Supabase SQL editor; requires the pg_cron extension.
+
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+
+CREATE OR REPLACE FUNCTION refresh_room_statuses()
+RETURNS void
+LANGUAGE sql
+AS $$
+    -- Confirmed stays covering today (PKT) occupy their room
+    UPDATE rooms r
+    SET status = 'Occupied'
+    FROM bookings b
+    WHERE b.room_number = r.room_number
+      AND b.is_cancelled = false
+      AND b.status = 'confirmed'
+      AND b.stay @> (now() AT TIME ZONE 'Asia/Karachi')::date
+      AND r.status NOT IN ('Occupied', 'Maintenance');
+
+    -- Rooms whose stay has ended (and with no stay covering today) free up
+    UPDATE rooms r
+    SET status = 'Available'
+    WHERE r.status = 'Occupied'
+      AND NOT EXISTS (
+          SELECT 1
+          FROM bookings b
+          WHERE b.room_number = r.room_number
+            AND b.is_cancelled = false
+            AND b.stay @> (now() AT TIME ZONE 'Asia/Karachi')::date
+      );
+$$;
+
+-- Midnight PKT is 19:00 UTC
+SELECT cron.schedule('refresh-room-statuses', '0 19 * * *', 'SELECT refresh_room_statuses()');
@@ -0,0 +1,46 @@
+-- Precomputed payload for GET /availability/room-types-with-availability,
+-- the heaviest read endpoint (per-type availability + status breakdown).
+-- The endpoint serves this view when present and falls back to computing
+-- live. Requires sql/availability_rpc.sql (the bookings.stay column).
+-- Run once in the Supabase SQL editor.
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_room_types_availability AS
+SELECT
+    rt.id,
+    rt.name,
+    rt.base_price,
+    COALESCE(rt.max_adults, 2) AS max_adults,
+    COALESCE(rt.max_children, 1) AS max_children,
+    COALESCE(rt.max_adults, 2) + COALESCE(rt.max_children, 1) AS total_capacity,
+    rt.amenities,
+    count(r.room_number) AS total_rooms_count,
+    count(*) FILTER (
+        WHERE r.status <> 'Maintenance'
+          AND NOT EXISTS (
+              SELECT 1
+              FROM bookings b
+              WHERE b.room_number = r.room_number
+                AND b.is_cancelled = false
+                AND b.stay @> (now() AT TIME ZONE 'Asia/Karachi')::date
+          )
+    ) AS available_rooms_count,
+    jsonb_build_object(
+        'available',   count(*) FILTER (WHERE r.status = 'Available'),
+        'booked',      count(*) FILTER (WHERE r.status = 'Booked'),
+        'occupied',    count(*) FILTER (WHERE r.status = 'Occupied'),
+        'maintenance', count(*) FILTER (WHERE r.status = 'Maintenance')
+    ) AS status_breakdown
+FROM room_types rt
+LEFT JOIN rooms r ON r.room_type_id = rt.id
+GROUP BY rt.id;
+
+-- Unique index so REFRESH ... CONCURRENTLY works (readers never block)
+CREATE UNIQUE INDEX IF NOT EXISTS mv_room_types_availability_id
+    ON mv_room_types_availability (id);
+
+-- Refresh every 30s via pg_cron; cheap because the source tables are tiny
+SELECT cron.schedule(
+    'refresh-room-types-availability-mv',
+    '30 seconds',
+    'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_room_types_availability'
+);
@@ -0,0 +1,22 @@
+-- Dashboard stats aggregated in Postgres: one round trip returns the
+-- counters and the booking rows together, instead of shipping every row
+-- to Python and walking the list three times for the statistics.
+-- Run once in the Supabase SQL editor.
+
+CREATE OR REPLACE FUNCTION get_user_dashboard(p_user_id int DEFAULT NULL, p_email text DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'total_bookings', COUNT(*),
+        'confirmed_bookings', COUNT(*) FILTER (WHERE b.status = 'confirmed'),
+        'total_spent', COALESCE(
+            SUM(b.total_amount) FILTER (WHERE b.status IN ('confirmed', 'completed')), 0
+        ),
+        'bookings', COALESCE(jsonb_agg(to_jsonb(b)), '[]'::jsonb)
+    )
+    FROM user_bookings_simple b
+    WHERE (p_user_id IS NOT NULL AND b.user_id = p_user_id)
+       OR (p_user_id IS NULL AND p_email IS NOT NULL AND b.email = p_email);
+$$;
@@ -0,0 +1,29 @@
+-- Sub-linear user search: trigram GIN indexes let the %term% ILIKE
+-- filters in /users probe an index instead of sequentially scanning the
+-- table on every keystroke (gin_trgm_ops serves ILIKE directly, so no
+-- separate lower() index is needed). The generated name columns move
+-- the per-row first/last split out of the Python response loop.
+-- Run once in the Supabase SQL editor.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS users_email_trgm
+    ON users USING gin (email gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS users_phone_trgm
+    ON users USING gin (phone gin_trgm_ops);
+
+-- Same split as Python's name.split(" ", 1): first token, then the
+-- remainder (empty when there is no space)
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS first_name text
+    GENERATED ALWAYS AS (split_part(name, ' ', 1)) STORED;
+
+ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS last_name text
+    GENERATED ALWAYS AS (
+        CASE WHEN strpos(name, ' ') > 0
+             THEN substr(name, strpos(name, ' ') + 1)
+             ELSE ''
+        END
+    ) STORED;
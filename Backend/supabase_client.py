@@ -1,5 +1,10 @@
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
+from functools import lru_cache
+import asyncio
+import httpx
 import os
+import random
 from dotenv import load_dotenv
 
 load_dotenv()  # loads from .env
@@ -8,4 +13,92 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 EDGE_FUNCTION_URL = os.getenv("EDGE_FUNCTION_URL")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Rows read from Supabase were already validated on write, so routes may
+# skip re-validation (model_construct) when this is enabled. Set
+# TRUSTED_DB=false to force full validation on reads again.
+TRUSTED_DB = os.getenv("TRUSTED_DB", "true").lower() in ("1", "true", "yes")
+
+@lru_cache(maxsize=1)
+def get_supabase() -> Client:
+    """Singleton Supabase client - one HTTP session shared process-wide."""
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+supabase: Client = get_supabase()
+
+# Async PostgREST client for hot routes. The sync client above blocks the
+# event loop (or burns a thread-pool slot via asyncio.to_thread); awaiting
+# this client keeps availability checks fully on the event loop.
+_ASYNC_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+    "apikey": SUPABASE_KEY or "",
+    "Authorization": f"Bearer {SUPABASE_KEY}",
+}
+_ASYNC_TIMEOUT = httpx.Timeout(float(os.getenv("DB_HTTP_TIMEOUT", "10")), connect=5.0)
+
+supabase_async: AsyncPostgrestClient = AsyncPostgrestClient(
+    f"{SUPABASE_URL}/rest/v1",
+    headers=_ASYNC_HEADERS,
+    timeout=_ASYNC_TIMEOUT,
+)
+
+# Widen the connection pool on the shared session: the availability
+# endpoints fan out many small queries concurrently, and keeping warm
+# keep-alive connections avoids per-request TCP/TLS handshakes.
+supabase_async.session = httpx.AsyncClient(
+    base_url=f"{SUPABASE_URL}/rest/v1",
+    headers=_ASYNC_HEADERS,
+    timeout=_ASYNC_TIMEOUT,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    follow_redirects=True,
+    http2=True,
+)
+
+# Bound concurrent blocking Supabase calls so a traffic burst can't
+# exhaust Supavisor's connection pool (independent of the thread-pool
+# size configured at startup in main.py).
+DB_MAX_CONCURRENCY = int(os.getenv("DB_MAX_CONCURRENCY", "25"))
+_db_semaphore = asyncio.Semaphore(DB_MAX_CONCURRENCY)
+
+
+async def run_db(func):
+    """Run a blocking Supabase callable in the thread pool, bounded by
+    the shared semaphore. Drop-in for asyncio.to_thread(lambda: ...)."""
+    async with _db_semaphore:
+        return await asyncio.to_thread(func)
+
+
+# Transient PostgREST/Supavisor failures worth retrying: rate limits and
+# gateway hiccups. Anything else (4xx business errors) surfaces at once.
+_RETRYABLE_STATUS = {"429", "500", "502", "503", "504"}
+
+
+def _is_transient(exc: Exception) -> bool:
+    """True for connection-level errors and retryable HTTP statuses."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is None:
+        # postgrest APIError carries the HTTP status as a string in .code
+        status = getattr(exc, "code", None)
+    return str(status) in _RETRYABLE_STATUS
+
+
+async def retry_db(make_call, attempts: int = 3, base_delay: float = 0.1, max_delay: float = 2.0):
+    """Await make_call() with jittered exponential backoff on transient
+    failures (429/5xx/connection drops).
+
+    make_call must build a fresh request each time it is invoked and the
+    operation must be idempotent - a retried non-idempotent insert can
+    double-write when the first attempt actually committed.
+    """
+    for attempt in range(attempts):
+        try:
+            return await make_call()
+        except Exception as exc:
+            if attempt == attempts - 1 or not _is_transient(exc):
+                raise
+            delay = min(base_delay * (2 ** attempt), max_delay)
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
@@ -1,12 +1,14 @@
 # utils/booking_cleanup.py - Background task manager for booking cleanup
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Set
 from supabase_client import supabase
 
 logger = logging.getLogger(__name__)
 
+UTC = timezone.utc
+
 class BookingCleanupManager:
     """Manages cleanup of abandoned bookings"""
     
@@ -113,7 +115,7 @@ class BookingCleanupManager:
             #     "type": "booking_expired",
             #     "booking_id": booking_id,
             #     "message": f"Booking {booking_id} expired due to incomplete payment",
-            #     "created_at": datetime.utcnow().isoformat()
+            #     "created_at": datetime.now(UTC).isoformat()
             # }).execute()
             
         except Exception as e:
@@ -129,7 +131,7 @@ class BookingCleanupManager:
         """Manual cleanup of all expired bookings (can be run periodically)"""
         try:
             # Find all pending bookings older than 15 minutes
-            cutoff_time = datetime.utcnow() - timedelta(minutes=15)
+            cutoff_time = datetime.now(UTC) - timedelta(minutes=15)
             
             expired_bookings = supabase.table("bookings").select("*").eq("status", "pending").lt("created_at", cutoff_time.isoformat()).execute()
             
@@ -1,6 +1,7 @@
 # utils/cache_helper.py
-import json
+import orjson
 import logging
+import time
 from typing import Any, Optional, List
 from datetime import datetime, timedelta
 from utils.redis_client import r
@@ -21,16 +22,37 @@ class CacheManager:
     USER_DASHBOARD_KEY = "user_dashboard:{user_id}"
         # Add new cache keys
     BILLING_SETTINGS_KEY = "billing_settings"
-    
-    
+    ROOM_TYPES_KEY = "room_types"
+    # Availability-bearing listings are scoped by PKT day because the
+    # underlying checks depend on "today" in PKT
+    ROOM_TYPES_FOR_BOOKING_KEY = "roomtypes:for_booking:{pkt_day}"
+    ROOM_TYPES_WITH_AVAILABILITY_KEY = "roomtypes:with_availability:{pkt_day}"
+    ADMIN_ROOM_TYPES_KEY = "roomtypes:admin:{check_in}:{check_out}"
+
+
     # Cache expiration times (in seconds)
     DEFAULT_TTL = 120  # 2 minutes
     ROOM_STATS_TTL = 60  # 1 minute
-    AVAILABILITY_TTL = 180  # 3 minutes
+    AVAILABILITY_TTL = 60  # 1 minute - every booking mutates this data
     USER_DASHBOARD_TTL = 600  # 10 minutes
     BILLING_SETTINGS_TTL = 86400  # 24 hours
+    ROOM_TYPES_TTL = 300  # 5 minutes
+    ROOM_TYPE_ROW_TTL = 60  # 1 minute - in-process per-id room_type rows
+    ROOM_ROW_TTL = 30  # 30s - in-process per-type room lists
+
+    # In-process cache of single room_type rows: {id: (row, expires_at)}.
+    # Room types change on human timescales, so a short TTL plus explicit
+    # invalidation from the write routes keeps the hot booking path off
+    # the network entirely.
+    _room_type_rows: dict = {}
+
+    # In-process cache of non-maintenance room lists per type, same
+    # (value, expires_at) shape. Rooms change far less often than
+    # bookings, and booking writes invalidate this explicitly, so 30s
+    # of staleness is the worst case.
+    _rooms_by_type: dict = {}
+
 
-    
     @staticmethod
     def get_cache(key: str) -> Optional[Any]:
         if not REDIS_AVAILABLE:
@@ -38,7 +60,7 @@ class CacheManager:
         try:
             cached_data = r.get(key)
             if cached_data:
-                return json.loads(cached_data)
+                return orjson.loads(cached_data)
         except Exception as e:
             logger.debug(f"Cache get failed for key {key}: {e}")
         return None
@@ -50,7 +72,9 @@ class CacheManager:
         if not REDIS_AVAILABLE:
             return False
         try:
-            r.setex(key, ttl, json.dumps(data, default=str))
+            # orjson emits bytes (redis-py takes them as-is) and handles
+            # date/datetime natively; default=str covers the rest
+            r.setex(key, ttl, orjson.dumps(data, default=str))
             return True
         except Exception as e:
             logger.debug(f"Cache set failed for key {key}: {e}")
@@ -107,6 +131,10 @@ class CacheManager:
             cleared_count += CacheManager.delete_cache(f"room:{room_number}")
             cleared_count += CacheManager.delete_pattern(f"room_search:*{room_number}*")
 
+        # Room status flips with bookings, so any room write drops the
+        # in-process per-type lists (tiny dict, cheap to rebuild)
+        CacheManager._rooms_by_type.clear()
+
         if room_type:
             cleared_count += CacheManager.delete_pattern(f"room_availability:{room_type}:*")
         
@@ -151,16 +179,75 @@ class CacheManager:
         # Clear specific room cache if room_number provided
         if room_number:
             CacheManager.delete_cache(f"room:{room_number}")
-        
+
+        # Availability listings reflect the new Booked/Occupied state
+        CacheManager.invalidate_availability_cache()
+
         logger.info(f"Invalidated booking-related cache for room: {room_number}, user: {user_id}")
 
 
+    @staticmethod
+    def invalidate_availability_cache():
+        """Invalidate availability-bearing listings after a booking change"""
+        cleared = CacheManager.delete_pattern("roomtypes:*")
+        cleared += CacheManager.delete_pattern("room_availability:*")
+        logger.info(f"Cleared {cleared} availability cache entries")
+        return cleared
+
+
     @staticmethod
     def invalidate_billing_settings_cache():
         """Invalidate billing settings cache when settings are updated"""
         CacheManager.delete_cache(CacheManager.BILLING_SETTINGS_KEY)
         logger.info("Invalidated billing settings cache")
 
+    @staticmethod
+    async def get_room_type_cached(room_type_id: int) -> Optional[dict]:
+        """Fetch one room_type row by id, cached in-process for a short TTL."""
+        now = time.monotonic()
+        entry = CacheManager._room_type_rows.get(room_type_id)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        result = await asyncio.to_thread(
+            lambda: supabase.table("room_types")
+            .select("*")
+            .eq("id", room_type_id)
+            .execute()
+        )
+        row = result.data[0] if result.data else None
+        if row is not None:
+            CacheManager._room_type_rows[room_type_id] = (row, now + CacheManager.ROOM_TYPE_ROW_TTL)
+        return row
+
+    @staticmethod
+    async def get_rooms_of_type_cached(room_type_id: int) -> List[dict]:
+        """Non-maintenance rooms of a type, cached in-process for a short
+        TTL. Availability itself still hits the DB - only the room list
+        (which changes when rooms are added or serviced) is cached."""
+        now = time.monotonic()
+        entry = CacheManager._rooms_by_type.get(room_type_id)
+        if entry and entry[1] > now:
+            return entry[0]
+
+        result = await asyncio.to_thread(
+            lambda: supabase.table("rooms")
+            .select("room_number, room_type, room_type_id, status")
+            .eq("room_type_id", room_type_id)
+            .neq("status", "Maintenance")
+            .execute()
+        )
+        rows = result.data or []
+        CacheManager._rooms_by_type[room_type_id] = (rows, now + CacheManager.ROOM_ROW_TTL)
+        return rows
+
+    @staticmethod
+    def invalidate_room_types_cache():
+        """Invalidate cached room_types rows when a room type is written"""
+        CacheManager.delete_cache(CacheManager.ROOM_TYPES_KEY)
+        CacheManager._room_type_rows.clear()
+        logger.info("Invalidated room types cache")
+
 # Decorator for automatic cache invalidation
 def invalidate_cache_on_booking_change(func):
     """Decorator to automatically invalidate cache after booking operations"""
@@ -197,25 +284,47 @@ async def get_billing_settings_cached() -> dict:
         if cached_settings:
             return cached_settings
 
+        # Singleton row (sql/billing_settings_singleton.sql): a PK point
+        # lookup instead of order-by-desc + limit
         settings_result = await asyncio.to_thread(
             lambda: supabase.table("billing_settings")
-            .select("*")
-            .order("id", desc=True)
-            .limit(1)
+            .select("id, vat, discount, updated_at")
+            .eq("id", 1)
             .execute()
         )
 
         if settings_result.data:
+            row = settings_result.data[0]
             settings = {
-                "vat": float(settings_result.data[0]["vat"]),
-                "discount": float(settings_result.data[0]["discount"])
+                "id": row.get("id"),
+                "vat": float(row["vat"]),
+                "discount": float(row["discount"]),
+                "updated_at": row.get("updated_at")
             }
         else:
-            settings = {"vat": 13.0, "discount": 0.0}
+            settings = {"id": None, "vat": 13.0, "discount": 0.0, "updated_at": None}
 
         CacheManager.set_cache(CacheManager.BILLING_SETTINGS_KEY, settings, CacheManager.BILLING_SETTINGS_TTL)
         return settings
 
     except Exception as e:
         logger.warning(f"⚠️ Billing settings fallback to defaults due to: {e}")
-        return {"vat": 13.0, "discount": 0.0}
+        return {"id": None, "vat": 13.0, "discount": 0.0, "updated_at": None}
+
+
+async def get_room_types_cached() -> list:
+    """Fetch all room_types rows, cached (they change rarely).
+
+    Invalidated write-through from the room-type create/update/delete routes.
+    """
+    cached_types = CacheManager.get_cache(CacheManager.ROOM_TYPES_KEY)
+    if cached_types:
+        return cached_types
+
+    result = await asyncio.to_thread(
+        lambda: supabase.table("room_types").select("*").execute()
+    )
+    room_types = result.data or []
+
+    CacheManager.set_cache(CacheManager.ROOM_TYPES_KEY, room_types, CacheManager.ROOM_TYPES_TTL)
+    return room_types